@@ -0,0 +1,4 @@
+from .backends import BACKENDS, get_backend
+from .crawler import Crawler
+from .fetcher import Fetcher
+from .frontier import Frontier, FrontierItem
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from nltk.stem import PorterStemmer
+from nltk.tokenize import word_tokenize
+import os
+import re
+from .trec import read_documents
+
+ps = PorterStemmer()
+WORD = re.compile(r"\w+(?:[-'.]\w+)*|[^\w\s]+")
+
+# Tokenizers that analysis can run with. "nltk" is NLTK's word_tokenize, the
+# indexer's original tokenizer. "regex" is a single precompiled pattern that
+# splits out words and runs of punctuation much faster, without word_tokenize's
+# handling of contractions and quotes
+TOKENIZERS = {
+    "nltk": word_tokenize,
+    "regex": WORD.findall,
+}
+
+# Memoized stemmer, shared by every Analyzer in the process. The vocabulary
+# of a crawl is small next to its token count, so nearly every token is a hit
+@lru_cache(maxsize=1 << 18)
+def stem(token):
+    return ps.stem(token)
+
+# Reads a stoplist with one word per line into a set
+def load_stopwords(path):
+    with open(path) as file:
+        return frozenset(file.read().split('\n'))
+
+# Turns document text into the indexed form: lowercased tokens, stopwords
+# removed, Porter stemmed and joined by single spaces
+class Analyzer:
+    def __init__(self, stopwords, tokenizer="nltk"):
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
+        self.stopwords = frozenset(stopwords)
+        self.tokenize = TOKENIZERS[tokenizer]
+
+    def analyze(self, text):
+        stopwords = self.stopwords
+        return " ".join([stem(token) for token in map(str.lower, self.tokenize(text)) if token not in stopwords])
+
+analyzer = None # Analyzer of each pool process, set by _init_process
+
+def _init_process(stopwords, tokenizer):
+    global analyzer
+    analyzer = Analyzer(stopwords, tokenizer)
+
+# Analyzes every document of a results file in a pool process
+def _analyze_file(file_path):
+    return [(url, analyzer.analyze(text)) for url, title, text in read_documents(file_path)]
+
+# Analysis stage that spreads results files over a ProcessPoolExecutor, one
+# file per task, since tokenizing and stemming are bound by the GIL. Workers
+# read the files themselves, so only the analyzed text is sent back. At most
+# max_pending files are in flight, which keeps memory bounded however large
+# the corpus is
+class AnalysisPool:
+    def __init__(self, stopwords, tokenizer="nltk", processes=None, max_pending=None):
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer: {tokenizer}")
+        self.processes = processes or os.cpu_count()
+        self.executor = ProcessPoolExecutor(self.processes, initializer=_init_process, initargs=(frozenset(stopwords), tokenizer))
+        self.max_pending = max_pending or 2 * self.processes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    # Yields the (url, analyzed text) of every document in the passed files,
+    # in the order of the files and of the documents within each file
+    def analyze_files(self, file_paths):
+        pending = []
+        for file_path in file_paths:
+            pending.append(self.executor.submit(_analyze_file, file_path))
+            if len(pending) >= self.max_pending:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+    def shutdown(self):
+        self.executor.shutdown()
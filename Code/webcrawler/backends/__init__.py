@@ -0,0 +1,22 @@
+from .sequential import SequentialCrawler
+from .threaded import ThreadedCrawler
+
+BACKENDS = {
+    SequentialCrawler.name: SequentialCrawler,
+    ThreadedCrawler.name: ThreadedCrawler,
+}
+
+try:
+    from .aio import AsyncCrawler
+    BACKENDS[AsyncCrawler.name] = AsyncCrawler
+except ImportError:
+    AsyncCrawler = None # aiohttp is not installed
+
+'''
+Returns the crawler class registered under name
+'''
+def get_backend(name):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend: {name}")
@@ -0,0 +1,131 @@
+import aiohttp
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from ..crawler import Crawler
+from ..fetcher import MAX_REDIRECTS, is_english_html
+import os
+from time import time
+from urllib.parse import urlparse
+
+'''
+Crawls on an asyncio event loop with aiohttp. Page fetches and host wait
+times do not hold a thread, so thousands of requests can be in flight
+'''
+class AsyncCrawler(Crawler):
+    name = "async"
+    default_concurrency = 100
+    partitionable = False # Takes urls from the frontier directly, not the HostScheduler
+
+    '''
+    Runs the crawler on an asyncio event loop. concurrency is the number of
+    requests in flight at once, per_host caps the open connections to any one
+    host. Parsing runs on parse_executor, or the parse pool if the crawler has
+    one, so it does not block the event loop
+    '''
+    def crawl(self, num_hits, concurrency=100, per_host=10, parse_executor=None):
+        return asyncio.run(self._crawl(num_hits, concurrency, per_host, parse_executor))
+
+    async def _crawl(self, num_hits, concurrency, per_host, parse_executor):
+        self.num_hits = num_hits
+        self.in_flight = 0
+        self.work_available = asyncio.Condition()
+        own_executor = parse_executor is None
+        if own_executor:
+            parse_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        self.parse_executor = parse_executor
+
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+        # No total timeout: body downloads are bounded by the body reader's deadline
+        timeout = aiohttp.ClientTimeout(sock_connect=10, sock_read=10)
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                workers = [asyncio.create_task(self._worker(session)) for _ in range(concurrency)]
+                await asyncio.gather(*workers)
+        finally:
+            if own_executor:
+                parse_executor.shutdown()
+
+        return self.finish()
+
+    # Takes urls from the frontier until the crawl is done. When the frontier is
+    # momentarily empty, waits for in-flight pages that may add new outlinks
+    async def _worker(self, session):
+        while self.count < self.num_hits:
+            url = self.frontier.get_next_url()
+            if url is None:
+                if self.in_flight == 0:
+                    async with self.work_available:
+                        self.work_available.notify_all()
+                    return
+                async with self.work_available:
+                    await self.work_available.wait()
+                continue
+
+            self.in_flight += 1
+            try:
+                await self._crawl_url(session, url)
+            finally:
+                self.in_flight -= 1
+                async with self.work_available:
+                    self.work_available.notify_all()
+
+    async def _crawl_url(self, session, url):
+        loop = asyncio.get_running_loop()
+        domain = urlparse(url).netloc.lower()
+        if url in self.visited_pages:
+            return
+        if domain in self.fetcher.skipped_domains:
+            self.reject(url, "rejected_skipped_domain")
+            return
+
+        # robots.txt is fetched with blocking IO, so it runs off the event loop
+        can_crawl, delay = await loop.run_in_executor(None, self._check_robots, url)
+        if not can_crawl:
+            self.reject(url, "rejected_by_robots")
+            return
+
+        # Politeness: wait out the host's crawl delay without holding a thread
+        wait_time = self.next_fetch.get(domain, 0) - time()
+        self.next_fetch[domain] = max(time(), self.next_fetch.get(domain, 0)) + delay
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+        content, charset, site_url = await self._fetch(session, url, domain)
+        if content is None:
+            self.reject(url, "rejected_invalid_page")
+            return
+
+        if self.parse_pool is not None:
+            # The pool blocks callers when it is full, so wait on it from a thread
+            outlinks, text_data, title = await loop.run_in_executor(None, self.parse_pool.parse, content, site_url, charset)
+        else:
+            outlinks, text_data, title = await loop.run_in_executor(self.parse_executor, self.extractor.extract, content, site_url, charset)
+        self.record_page(url, outlinks, text_data, title)
+
+    def _check_robots(self, url):
+        try:
+            return self.robots.can_fetch(url), self.robots.delay(url)
+        except Exception as e:
+            return False, 0
+
+    # Fetches a page with a single GET, checking the content type and language
+    # from the response headers before reading the body, which is streamed under
+    # the fetcher's size and time caps. Returns (content, charset, url), or
+    # (None, None, None) for pages that are not english HTML, were skipped or
+    # could not be fetched
+    async def _fetch(self, session, url, domain):
+        if not self.fetcher.domain_allowed(domain):
+            return None, None, None
+        try:
+            async with session.get(url, max_redirects=MAX_REDIRECTS) as res:
+                if res.status != 200 or not is_english_html(res.headers):
+                    return None, None, None
+                content, charset = await self.fetcher.body_reader.read_async(res)
+                if content is None:
+                    return None, None, None
+                self.fetcher.record_visit(domain)
+                return content, charset, str(res.url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return None, None, None
+        except Exception as e:
+            return None, None, None
@@ -0,0 +1,22 @@
+from ..crawler import Crawler
+
+'''
+Crawls one url at a time on the calling thread. Host wait times are still
+enforced by the HostScheduler, so the crawl sleeps whenever every queued
+host is cooling down
+'''
+class SequentialCrawler(Crawler):
+    name = "sequential"
+    default_concurrency = 1
+
+    '''
+    Runs the crawler. concurrency is accepted for a uniform backend
+    interface and must be 1
+    '''
+    def crawl(self, num_hits, concurrency=1):
+        if concurrency != 1:
+            raise ValueError("The sequential backend only supports a concurrency of 1")
+        self.start(num_hits)
+        while self.count < num_hits and self.step():
+            pass
+        return self.finish()
@@ -0,0 +1,33 @@
+from ..crawler import Crawler
+import threading
+
+'''
+Crawls with a pool of worker threads that share the frontier, the
+scheduler and the session's connection pools
+'''
+class ThreadedCrawler(Crawler):
+    name = "threaded"
+    default_concurrency = 10
+
+    '''
+    Runs the crawler. concurrency is the number of worker threads
+    '''
+    def crawl(self, num_hits, concurrency=10):
+        threads = []
+        self.start(num_hits)
+
+        # Define crawler behavior for each worker thread. Urls come from the
+        # scheduler, which only hands out urls whose host may be contacted now
+        def worker():
+            while self.count < num_hits and self.step():
+                pass
+
+        for _ in range(concurrency):
+            thread = threading.Thread(target=worker)
+            threads.append(thread)
+            thread.start()
+
+        for thread in threads:
+            thread.join() # Wait for each thread to complete before ending crawl
+
+        return self.finish()
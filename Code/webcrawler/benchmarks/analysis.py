@@ -0,0 +1,74 @@
+from ..analysis import TOKENIZERS, Analyzer, AnalysisPool, load_stopwords
+from nltk.stem import PorterStemmer
+import os
+import random
+from ..sink import format_document
+import sys
+import tempfile
+from timeit import default_timer as timer
+from ..trec import read_documents
+
+words = ["romney", "governor", "boston", "politics", "republican", "senate", "history", "elections", "massachusetts",
+         "economy", "campaigned", "the", "of", "and", "a", "in", "was", "running", "nominee", "presidential"]
+
+# Writes num_files results files of docs_per_file documents of words_per_doc words each
+def make_corpus(folder, num_files=16, docs_per_file=100, words_per_doc=500, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(num_files):
+        path = os.path.join(folder, f"results_{i + 1}.txt")
+        with open(path, 'w') as file:
+            for j in range(docs_per_file):
+                lines = [" ".join(rng.choice(words) for _ in range(20)) + rng.choice([".", ",", "!"]) for _ in range(words_per_doc // 20)]
+                file.write(format_document(f"http://en.wikipedia.org/wiki/Page_{i}_{j}", "", "\n".join(lines)))
+        paths.append(path)
+    return paths
+
+# The indexer's original analysis: stoplist list scan and an uncached stem per token
+def process_content(text, tokenize, stopwords, ps=PorterStemmer()):
+    results = ''
+    for token in tokenize(text):
+        token = token.lower()
+        if token in stopwords:
+            continue
+        results += ps.stem(token) + ' '
+    return results.strip()
+
+if __name__ == '__main__':
+    stoplist = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "..", "..", "Results", "stoplist.txt")
+    stopwords = load_stopwords(stoplist)
+    folder = tempfile.mkdtemp()
+    paths = make_corpus(folder)
+    documents = [doc for path in paths for doc in read_documents(path)]
+    tokenizers = []
+    for name, tokenize in TOKENIZERS.items():
+        try:
+            tokenize("probe text")
+            tokenizers.append(name)
+        except LookupError:
+            print(f"{name} tokenizer unavailable, its data is not installed")
+    num_tokens = sum(len(TOKENIZERS[tokenizers[0]](text)) for url, title, text in documents)
+    print(f"{len(documents)} documents, {num_tokens} tokens, {os.cpu_count()} cores")
+
+    for name in tokenizers:
+        tokenize = TOKENIZERS[name]
+        stoplist_list = list(stopwords)
+        start = timer()
+        expected = [process_content(text, tokenize, stoplist_list) for url, title, text in documents]
+        print(f"{name:>5}, original:       {num_tokens / (timer() - start):10.0f} tokens/sec")
+
+        analyzer = Analyzer(stopwords, name)
+        start = timer()
+        analyzed = [analyzer.analyze(text) for url, title, text in documents]
+        print(f"{name:>5}, analyzer:       {num_tokens / (timer() - start):10.0f} tokens/sec")
+        assert analyzed == expected
+
+        processes = 1
+        while processes <= os.cpu_count():
+            with AnalysisPool(stopwords, name, processes) as pool:
+                start = timer()
+                results = list(pool.analyze_files(paths))
+                print(f"{name:>5}, pool {processes:>2} procs:  {num_tokens / (timer() - start):10.0f} tokens/sec")
+            assert [text for url, text in results] == expected
+            assert [url for url, text in results] == [url for url, title, text in documents]
+            processes *= 2
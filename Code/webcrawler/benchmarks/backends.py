@@ -0,0 +1,35 @@
+import argparse
+from ..backends import BACKENDS
+from contextlib import redirect_stdout
+import io
+from .stubserver import StubServer
+from timeit import default_timer as timer
+
+# Runs a crawl with its per-page output suppressed and returns pages/sec
+def pages_per_sec(crawl):
+    start = timer()
+    with redirect_stdout(io.StringIO()):
+        results = crawl()
+    return len(results) / (timer() - start)
+
+# Crawls the stub server with every registered backend at each concurrency
+# level, starting from the same seeds and related terms. Backends whose
+# default concurrency is 1 are only run once
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compares the crawl backends on a local stub server")
+    parser.add_argument("--num-hits", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=list(BACKENDS))
+    args = parser.parse_args()
+
+    server = StubServer()
+    server.start()
+    related_terms = ["Mitt Romney", "Governor", "Romney"]
+
+    for name in args.backends:
+        backend = BACKENDS[name]
+        levels = [1] if backend.default_concurrency == 1 else args.concurrency
+        for concurrency in levels:
+            crawler = backend(server.seeds(), related_terms)
+            rate = pages_per_sec(lambda: crawler.crawl(args.num_hits, concurrency))
+            print(f"{name:>10} concurrency {concurrency:>4}: {rate:8.1f} pages/sec")
@@ -0,0 +1,46 @@
+from ..bulkindex import BulkIndexer
+from ..session import SessionPool
+from .stubes import StubElasticsearch
+import random
+from timeit import default_timer as timer
+
+words = ["romney", "governor", "boston", "politics", "republican", "senate", "history", "election", "massachusetts", "economy"]
+
+def make_documents(num_docs, seed=0):
+    rng = random.Random(seed)
+    page = lambda: f"http://en.wikipedia.org/wiki/Page_{rng.randrange(num_docs)}"
+    return {f"http://en.wikipedia.org/wiki/Page_{i}": {
+                "content": " ".join(rng.choice(words) for _ in range(400)),
+                "inlinks": [page() for _ in range(10)],
+                "outlinks": [page() for _ in range(10)],
+                "author": "Jay"}
+            for i in range(num_docs)}
+
+# One index request per document, as indexer.py sent them with es.index
+def index_serially(stub, index, documents):
+    pool = SessionPool()
+    start = timer()
+    for doc_id, document in documents.items():
+        res = pool.session().put(f"{stub.url}/{index}/_doc/{doc_id}", json=document)
+        res.raise_for_status()
+    return len(documents) / (timer() - start)
+
+if __name__ == '__main__':
+    num_docs = 5000
+    documents = make_documents(num_docs)
+    stub = StubElasticsearch(reject_every=7, reject_doc_every=500)
+    stub.start()
+
+    stub.create_index("serial")
+    print(f"es.index loop:      {index_serially(stub, 'serial', documents):8.1f} docs/sec")
+
+    for workers in [1, 4, 8]:
+        index = f"bulk{workers}"
+        stub.create_index(index)
+        stub.documents.clear()
+        with BulkIndexer(stub.url, index, max_docs=500, workers=workers, backoff=0.05) as bulk:
+            for doc_id, document in documents.items():
+                bulk.index(doc_id, document)
+
+        print(f"bulk, {workers} workers:    {bulk.docs_per_sec():8.1f} docs/sec, {bulk.requests} requests, {bulk.retries} retries")
+    stub.stop()
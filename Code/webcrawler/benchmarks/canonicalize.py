@@ -0,0 +1,38 @@
+from ..canonicalizeurls import canonicalize_many, canonicalize_url
+import random
+from ..tests.test_canonicalize import reference_canonicalize_url
+from timeit import default_timer as timer
+
+# Times the reference, cached and batch canonicalization on the links of
+# Wikipedia-like pages. That they agree is checked by webcrawler.tests.test_canonicalize
+if __name__ == '__main__':
+    rng = random.Random(0)
+
+    # Wikipedia-like pages: mostly root-relative links, many repeated across pages
+    pages = []
+    for i in range(2000):
+        base = f"http://en.wikipedia.org/wiki/Page_{i}"
+        hrefs = [f"/wiki/Article_{rng.randint(0, 20000)}" for _ in range(150)]
+        hrefs += [f"#cite_note-{j}" for j in range(20)]
+        hrefs += ["https://en.wikipedia.org/wiki/Main_Page", "//en.m.wikipedia.org/wiki/Page", "http://www.boston.com/"]
+        pages.append((base, hrefs))
+    num_links = sum(len(hrefs) for _, hrefs in pages)
+
+    start = timer()
+    for base, hrefs in pages:
+        [reference_canonicalize_url(href, base) for href in hrefs]
+    reference = timer() - start
+
+    start = timer()
+    for base, hrefs in pages:
+        [canonicalize_url(href, base) for href in hrefs]
+    single = timer() - start
+
+    start = timer()
+    for base, hrefs in pages:
+        canonicalize_many(hrefs, base)
+    batch = timer() - start
+
+    print(f"reference:         {num_links / reference:12,.0f} links/sec")
+    print(f"canonicalize_url:  {num_links / single:12,.0f} links/sec")
+    print(f"canonicalize_many: {num_links / batch:12,.0f} links/sec")
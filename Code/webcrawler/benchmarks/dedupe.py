@@ -0,0 +1,71 @@
+import argparse
+from ..dedupe import NearDuplicateIndex
+import random
+from timeit import default_timer as timer
+
+NAVIGATION = "Main page Contents Current events Random article About Contact us Donate Log in Search"
+FOOTER = "This page was last edited on 3 March 2024 Privacy policy Terms of Use Mobile view"
+
+# Builds a crawl-like stream of (url, text, original) pages: articles of
+# Zipf-distributed words, with a share of them followed later by a copy
+# under another url. Copies are exact mirrors, printable views without the
+# navigation and footer, mobile views with the text cut short, or revisions
+# with a few words changed. original is the url of the copied article, or None
+def make_pages(num_pages, duplicate_share=0.2, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(50000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    pages = []
+    articles = []
+    while len(pages) < num_pages:
+        if articles and rng.random() < duplicate_share:
+            url, words = rng.choice(articles)
+            kind = rng.choice(["mirror", "printable", "mobile", "revision"])
+            if kind == "mirror":
+                text = " ".join([NAVIGATION, *words, FOOTER])
+            elif kind == "printable":
+                text = " ".join(words)
+            elif kind == "mobile":
+                text = " ".join(words[:int(len(words) * 0.9)] + [FOOTER])
+            else:
+                revised = list(words)
+                for _ in range(len(revised) // 50):
+                    revised[rng.randrange(len(revised))] = rng.choice(vocabulary)
+                text = " ".join([NAVIGATION, *revised, FOOTER])
+            pages.append((f"{url}?view={kind}&copy={len(pages)}", text, url))
+        else:
+            url = f"http://en.wikipedia.org/wiki/Article_{len(pages)}"
+            words = rng.choices(vocabulary, weights, k=rng.randint(200, 1500))
+            articles.append((url, words))
+            pages.append((url, " ".join([NAVIGATION, *words, FOOTER]), None))
+    return pages
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures near duplicate detection on a synthetic crawl")
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--duplicate-share", type=float, default=0.2)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.duplicate_share)
+    index = NearDuplicateIndex()
+    found = 0
+    false_positives = 0
+    start = timer()
+    for i, (url, text, original) in enumerate(pages, 1):
+        duplicate_of = index.check(url, text)
+        if duplicate_of is not None:
+            if original is not None:
+                found += 1
+            else:
+                false_positives += 1
+        if i % (args.pages // 4) == 0:
+            stats = index.stats()
+            print(f"{i:>7} pages: {stats['dedupe_signature_us']:7.0f} us/signature, {stats['dedupe_lookup_us']:6.1f} us/lookup")
+    elapsed = timer() - start
+
+    copies = sum(original is not None for url, text, original in pages)
+    stats = index.stats()
+    print(f"{args.pages} pages, {copies} near duplicate copies, {elapsed:.1f}s")
+    print(f"dedupe rate: {stats['dedupe_rate']:.3f}")
+    print(f"recall: {found / copies:.3f}, false positives: {false_positives}")
+    print(f"per page: {stats['dedupe_signature_us']:.0f} us signature, {stats['dedupe_lookup_us']:.1f} us lookup")
@@ -0,0 +1,30 @@
+from ..extractors import EXTRACTORS
+import os
+import sys
+from timeit import default_timer as timer
+
+# Returns the (name, contents) of every .html file in a directory tree
+def load_corpus(folder):
+    corpus = []
+    for root, _, filenames in os.walk(folder):
+        for filename in sorted(filenames):
+            if filename.endswith((".html", ".htm")):
+                with open(os.path.join(root, filename), 'rb') as file:
+                    corpus.append((filename, file.read()))
+    return corpus
+
+# Times every extractor on a folder of saved pages. Their output is checked
+# against the BeautifulSoup reference by webcrawler.tests.test_extractors
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit("Pass a folder of saved .html pages to benchmark parse throughput")
+    corpus = load_corpus(sys.argv[1])
+
+    total_bytes = sum(len(content) for _, content in corpus)
+    for extractor_name, extractor_class in EXTRACTORS.items():
+        extractor = extractor_class()
+        start = timer()
+        for _, content in corpus:
+            extractor.extract(content, "http://example.com/wiki/page")
+        elapsed = timer() - start
+        print(f"{extractor_name:>9}: {len(corpus) / elapsed:8.1f} pages/sec, {total_bytes / elapsed / 1e6:6.2f} MB/sec")
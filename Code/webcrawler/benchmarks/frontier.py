@@ -0,0 +1,102 @@
+from ..frontier import Frontier, FrontierItem
+from ..scoring import DEFAULT_WEIGHTS, score
+import heapq
+import random
+from timeit import default_timer as timer
+import tracemalloc
+
+related_terms = ["Mitt Romney", "Republican", "Massachussetts", "Governor", "New England", "MA", "Romney"]
+words = ["Romney", "Governor", "Boston", "Politics", "Republican", "Senate", "History", "Election", "Massachusetts", "Economy"]
+domains = ["en.wikipedia.org", "www.boston.com", "malegislature.gov", "www.harvard.edu", "www.wbur.org", "www.nytimes.com"]
+
+# Recomputes the score of an item from its inlinks, as every comparison did
+# before scores were cached. The reference for the cached priority
+def compute_score(item, weights=DEFAULT_WEIGHTS):
+    trusted_domain_count = 0
+    for link in item.inlinks_set:
+        if link.endswith(".org"):
+            trusted_domain_count += 1
+        elif link.endswith(".edu"):
+            trusted_domain_count += 1
+        elif link.endswith(".gov"):
+            trusted_domain_count += 1
+    return score(weights, item.term_matches, item.wavenum, item.trusted, len(item.inlinks_set), trusted_domain_count)
+
+# Frontier item that rescores itself on every comparison,
+# matching the behavior before scores were cached
+class UncachedFrontierItem(FrontierItem):
+    def __lt__(self, other):
+        return compute_score(self) > compute_score(other)
+
+def make_items(item_class, num_items, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for i in range(num_items):
+        path = "_".join(rng.sample(words, 2))
+        url = f"http://{rng.choice(domains)}/wiki/{path}_{i}"
+        anchor = " ".join(rng.sample(words, 3))
+        item = item_class(url, "", rng.randint(1, 5), anchor, related_terms)
+        for _ in range(rng.randint(0, 8)):
+            item.add_inlink(f"http://{rng.choice(domains)}/wiki/page_{rng.randint(0, 1000)}")
+        items.append(item)
+    return items
+
+def push_pop(items):
+    queue = []
+    start = timer()
+    for item in items:
+        heapq.heappush(queue, item)
+    order = []
+    while queue:
+        order.append(heapq.heappop(queue).url)
+    return order, timer() - start
+
+# Adds num_urls urls to a Frontier, then inlinks to a random sample of them,
+# and pops everything. Returns the popped scores in order, the peak memory
+# traced while adding and the total time
+def fill_and_drain(num_urls, hot_capacity=None, seed=0):
+    rng = random.Random(seed)
+    urls = [f"http://{rng.choice(domains)}/wiki/{'_'.join(rng.sample(words, 2))}_{i}" for i in range(num_urls)]
+    tracemalloc.start()
+    start = timer()
+    frontier = Frontier(related_terms, hot_capacity)
+    for i, url in enumerate(urls):
+        frontier.add_url(url, urls[i // 2], rng.randint(1, 5), " ".join(rng.sample(words, 3)))
+    for _ in range(num_urls):
+        frontier.add_url(rng.choice(urls), f"http://{rng.choice(domains)}/wiki/page_{rng.randint(0, 1000)}")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    scores = []
+    while True:
+        url = frontier.get_next_url()
+        if url is None:
+            break
+        scores.append(frontier.url_map[url].priority)
+    frontier.close()
+    return scores, peak, timer() - start
+
+def tiered_benchmark(num_urls=100000, hot_capacity=10000):
+    unbounded_scores, unbounded_peak, unbounded_time = fill_and_drain(num_urls)
+    tiered_scores, tiered_peak, tiered_time = fill_and_drain(num_urls, hot_capacity)
+
+    # Spilling must not change the order urls come out in
+    assert tiered_scores == unbounded_scores
+    print(f"{num_urls} urls queued and drained, hot capacity {hot_capacity}")
+    print(f"unbounded: {unbounded_peak / 2**20:7.1f} MiB peak, {unbounded_time:.2f}s")
+    print(f"tiered:    {tiered_peak / 2**20:7.1f} MiB peak, {tiered_time:.2f}s")
+
+if __name__ == '__main__':
+    num_items = 20000
+    before_order, before = push_pop(make_items(UncachedFrontierItem, num_items))
+    after_order, after = push_pop(make_items(FrontierItem, num_items))
+
+    # Both queues must pop the same scores in the same order
+    scores = {item.url: compute_score(item) for item in make_items(FrontierItem, num_items)}
+    assert [scores[url] for url in before_order] == [scores[url] for url in after_order]
+
+    print(f"{num_items} items pushed and popped")
+    print(f"before (rescored): {before:.3f}s, {2 * num_items / before:,.0f} ops/sec")
+    print(f"after (cached):    {after:.3f}s, {2 * num_items / after:,.0f} ops/sec")
+    print(f"speedup: {before / after:.1f}x")
+    tiered_benchmark()
+
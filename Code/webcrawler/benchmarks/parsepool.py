@@ -0,0 +1,47 @@
+from .extractors import load_corpus
+from ..extractors import get_extractor
+import os
+from ..parsepool import ParsePool
+import sys
+import threading
+from timeit import default_timer as timer
+
+# Parses every page in the corpus from num_threads fetcher threads and returns pages/sec
+def run(corpus, parse, num_threads=10, repeat=3):
+    pages = corpus * repeat
+    next_page = 0
+    lock = threading.Lock()
+
+    def fetcher():
+        nonlocal next_page
+        while True:
+            with lock:
+                if next_page >= len(pages):
+                    return
+                name, content = pages[next_page]
+                next_page += 1
+            parse(content, "http://example.com/wiki/" + name)
+
+    threads = [threading.Thread(target=fetcher) for _ in range(num_threads)]
+    start = timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(pages) / (timer() - start)
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("usage: python -m webcrawler.benchmarks.parsepool <folder of saved .html pages>")
+        sys.exit(1)
+    corpus = load_corpus(sys.argv[1])
+    extractor = get_extractor("streaming")
+    print(f"{len(corpus)} pages, {os.cpu_count()} cores")
+    print(f"fetcher threads only:  {run(corpus, extractor.extract):8.1f} pages/sec")
+
+    processes = 1
+    while processes <= os.cpu_count():
+        pool = ParsePool(processes=processes)
+        print(f"parse pool, {processes:>2} procs: {run(corpus, pool.parse):8.1f} pages/sec")
+        pool.shutdown()
+        processes *= 2
@@ -0,0 +1,59 @@
+import argparse
+from contextlib import redirect_stdout
+import io
+import multiprocessing
+import os
+from ..partition import crawl_partitioned
+from .stubserver import StubServer
+import shutil
+import tempfile
+from timeit import default_timer as timer
+from ..trec import read_documents, results_files
+
+# Serves the stub web server from its own process, so it does not take CPU
+# from the partition being measured
+def serve(num_hosts, links_per_page, seeds):
+    server = StubServer(num_hosts=num_hosts, links_per_page=links_per_page)
+    server.start()
+    seeds.put(server.seeds())
+    multiprocessing.Event().wait()
+
+# Runs a partitioned crawl of the stub server and checks the merged results:
+# every crawled page is in the results files and the link graph once.
+# Returns pages/sec
+def run(num_partitions, seeds, num_hits, concurrency):
+    results_dir = tempfile.mkdtemp()
+    try:
+        start = timer()
+        with redirect_stdout(io.StringIO()):
+            stats = crawl_partitioned(num_partitions, seeds, ["Mitt Romney", "Governor", "Romney"], num_hits, results_dir,
+                                      concurrency=concurrency)
+        elapsed = timer() - start
+        urls = [url for path in results_files(results_dir) for url, title, text in read_documents(path)]
+        assert len(urls) == len(set(urls)) == stats["pages_crawled"], "a page was crawled by two partitions"
+        with open(os.path.join(results_dir, "graph", "crawled.log"), 'rb') as file:
+            assert len(file.read()) // 4 == len(urls)
+        return stats["pages_crawled"] / elapsed
+    finally:
+        shutil.rmtree(results_dir)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures how a partitioned crawl scales with the number of partitions")
+    parser.add_argument("--num-hits", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=20, help="worker threads per partition")
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--num-hosts", type=int, default=200)
+    args = parser.parse_args()
+
+    seeds = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(args.num_hosts, 20, seeds), daemon=True)
+    server.start()
+    seeds = seeds.get()
+    print(f"{os.cpu_count()} cores")
+
+    base = None
+    for num_partitions in args.partitions:
+        rate = run(num_partitions, seeds, args.num_hits, args.concurrency)
+        base = base or rate / num_partitions
+        print(f"{num_partitions:>2} partitions: {rate:8.1f} pages/sec, {rate / (base * num_partitions):.2f} of linear")
+    server.terminate()
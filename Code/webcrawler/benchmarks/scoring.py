@@ -0,0 +1,76 @@
+import argparse
+from ..frontier import Frontier
+from .frontier import domains, related_terms, words
+import numpy as np
+import random
+from ..scoring import DEFAULT_WEIGHTS, ScoreTable, score
+from timeit import default_timer as timer
+
+# Weights that favor inlinks over the wave, as a retuned focus might
+REWEIGHTED = {"term_match": 50, "wave": 200, "trusted_domain": 40, "inlink": 12, "trusted_inlink": 6}
+
+# Fills a ScoreTable with num_rows random feature rows
+def make_table(num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    table = ScoreTable(capacity=num_rows)
+    for row in range(num_rows):
+        table.add(0, 1, 0)
+    table.term_matches[:] = rng.integers(0, 4, num_rows)
+    table.wavenum[:] = rng.integers(1, 6, num_rows)
+    table.trusted[:] = rng.integers(0, 2, num_rows)
+    table.inlinks[:] = rng.integers(0, 50, num_rows)
+    table.trusted_inlinks[:] = rng.integers(0, 10, num_rows)
+    return table
+
+# Rescores every row of the table one at a time in Python, as scoring each
+# FrontierItem did, and with one vectorized expression
+def rescore_table(num_rows):
+    table = make_table(num_rows)
+    table.weights = REWEIGHTED
+    columns = [column.tolist() for column in (table.term_matches, table.wavenum, table.trusted, table.inlinks, table.trusted_inlinks)]
+    start = timer()
+    looped = [score(REWEIGHTED, *features) for features in zip(*columns)]
+    loop_time = timer() - start
+    start = timer()
+    vectorized = table.rescore()
+    vector_time = timer() - start
+    assert vectorized.tolist() == looped
+    print(f"rescoring {num_rows:,} entries")
+    print(f"per item:   {loop_time:.3f}s")
+    print(f"vectorized: {vector_time:.3f}s ({loop_time / vector_time:.0f}x)")
+
+# Queues num_urls urls with inlinks in a Frontier
+def fill(num_urls, weights=None, seed=0):
+    rng = random.Random(seed)
+    urls = [f"http://{rng.choice(domains)}/wiki/{'_'.join(rng.sample(words, 2))}_{i}" for i in range(num_urls)]
+    frontier = Frontier(related_terms, weights=weights)
+    frontier.add_urls([(url, urls[i // 2], rng.randint(1, 5), " ".join(rng.sample(words, 3))) for i, url in enumerate(urls)])
+    frontier.add_urls([(rng.choice(urls), f"http://{rng.choice(domains)}/wiki/page_{rng.randint(0, 1000)}") + (0, "")
+                       for _ in range(num_urls)])
+    return frontier
+
+def drain(frontier):
+    scores = []
+    while True:
+        url = frontier.get_next_url()
+        if url is None:
+            return scores
+        scores.append(frontier.url_map[url].priority)
+
+# Changes the weights of a filled Frontier, which rescores and requeues every
+# url, and checks it then pops in the order of a Frontier filled with the new weights
+def reweight_frontier(num_urls):
+    frontier = fill(num_urls)
+    start = timer()
+    frontier.set_weights(REWEIGHTED)
+    elapsed = timer() - start
+    assert drain(frontier) == drain(fill(num_urls, REWEIGHTED))
+    print(f"Frontier.set_weights with {num_urls:,} queued urls: {elapsed:.3f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures vectorized rescoring of frontier entries")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--frontier-urls", type=int, default=200000)
+    args = parser.parse_args()
+    rescore_table(args.rows)
+    reweight_frontier(args.frontier_urls)
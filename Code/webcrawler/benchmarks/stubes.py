@@ -0,0 +1,112 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+import threading
+from time import sleep
+
+# Local stub of the Elasticsearch endpoints indexer.py uses. Documents and
+# index settings are kept in memory. Every request is delayed by latency to
+# stand in for a network round trip, and bulk requests by per_doc for each
+# document they carry. Every reject_every-th bulk request is rejected whole
+# with a 429, and every reject_doc_every-th document in a bulk body too
+class StubElasticsearch:
+    def __init__(self, port=19200, latency=0.005, per_doc=0.00002, reject_every=0, reject_doc_every=0):
+        self.port = port
+        self.latency = latency
+        self.per_doc = per_doc
+        self.reject_every = reject_every
+        self.reject_doc_every = reject_doc_every
+        self.documents = {}
+        self.settings = {}
+        self.settings_history = [] # Every settings update, in order
+        self.bulk_requests = 0
+        self.doc_requests = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def create_index(self, index, refresh_interval="1s", number_of_replicas="1"):
+        self.settings[index] = {"refresh_interval": refresh_interval, "number_of_replicas": number_of_replicas}
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True # Headers and body go out in separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_GET(self):
+                index = self.path.strip('/').split('/')[0]
+                self.reply(200, {index: {"settings": {"index": dict(stub.settings[index])}}})
+
+            def do_PUT(self):
+                body = self.body()
+                sleep(stub.latency)
+                match = re.fullmatch(r"/([^/]+)/_doc/(.+)", self.path)
+                if match:
+                    with stub.lock:
+                        stub.doc_requests += 1
+                        stub.documents[match.group(2)] = json.loads(body)
+                    return self.reply(201, {"_id": match.group(2), "result": "created"})
+                index = self.path.strip('/').split('/')[0]
+                update = json.loads(body)["index"]
+                with stub.lock:
+                    stub.settings_history.append(dict(update))
+                    for key, value in update.items():
+                        if value is None:
+                            stub.settings[index].pop(key, None)
+                        else:
+                            stub.settings[index][key] = str(value)
+                self.reply(200, {"acknowledged": True})
+
+            def do_POST(self):
+                body = self.body()
+                if not self.path.endswith("/_bulk"):
+                    return self.reply(200, {"_shards": {"failed": 0}}) # _refresh
+                with stub.lock:
+                    stub.bulk_requests += 1
+                    reject = stub.reject_every and stub.bulk_requests % stub.reject_every == 0
+                    if reject:
+                        stub.rejected += 1
+                if reject:
+                    return self.reply(429, {"error": "es_rejected_execution_exception", "status": 429})
+                lines = body.decode('utf-8').splitlines()
+                sleep(stub.latency + stub.per_doc * len(lines) / 2)
+                items = []
+                with stub.lock:
+                    for action, source in zip(lines[::2], lines[1::2]):
+                        doc_id = json.loads(action)["index"]["_id"]
+                        stub.doc_requests += 1
+                        if stub.reject_doc_every and stub.doc_requests % stub.reject_doc_every == 0:
+                            stub.rejected += 1
+                            items.append({"index": {"_id": doc_id, "status": 429, "error": {"type": "es_rejected_execution_exception"}}})
+                        else:
+                            stub.documents[doc_id] = json.loads(source)
+                            items.append({"index": {"_id": doc_id, "status": 201, "result": "created"}})
+                self.reply(200, {"took": 1, "errors": any(item["index"]["status"] != 201 for item in items), "items": items})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,47 @@
+from aiohttp import web
+import asyncio
+import threading
+
+# Local stub web server. Serves generated english HTML pages on several
+# ports, each of which the crawlers treat as a separate host. Every
+# response is delayed to stand in for network latency
+class StubServer:
+    def __init__(self, num_hosts=50, links_per_page=20, latency=0.02, first_port=18000):
+        self.ports = [first_port + i for i in range(num_hosts)]
+        self.links_per_page = links_per_page
+        self.latency = latency
+        self.loop = asyncio.new_event_loop()
+        self.started = threading.Event()
+
+    async def robots(self, request):
+        return web.Response(text="User-agent: *\nDisallow: /private\n")
+
+    async def page(self, request):
+        await asyncio.sleep(self.latency)
+        num = int(request.match_info['num'])
+        links = []
+        for i in range(self.links_per_page):
+            target = (num * self.links_per_page + i + 1) % 1000000
+            port = self.ports[target % len(self.ports)]
+            links.append(f'<a href="http://127.0.0.1:{port}/wiki/Romney_{target}">Mitt Romney {target}</a>')
+        body = f"<html><head><title>Page {num}</title></head><body><p>Governor Romney page {num}.</p>{''.join(links)}</body></html>"
+        return web.Response(text=body, content_type="text/html", headers={"Content-Language": "en"})
+
+    def seeds(self):
+        return [f"http://127.0.0.1:{port}/wiki/Romney_{i}" for i, port in enumerate(self.ports)]
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        app = web.Application()
+        app.router.add_get('/robots.txt', self.robots)
+        app.router.add_get('/wiki/Romney_{num}', self.page)
+        runner = web.AppRunner(app, access_log=None)
+        self.loop.run_until_complete(runner.setup())
+        for port in self.ports:
+            self.loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port, backlog=2048).start())
+        self.started.set()
+        self.loop.run_forever()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        self.started.wait()
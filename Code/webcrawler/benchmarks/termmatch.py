@@ -0,0 +1,53 @@
+from .frontier import domains, related_terms, words
+from functools import lru_cache
+from nltk.stem import PorterStemmer
+import random
+from ..termmatch import TermMatcher
+from timeit import default_timer as timer
+
+ps = PorterStemmer()
+phrases = ["Mitt Romney", "New England", "Governor of Massachusetts", "Republican Party"]
+
+# Term matching as FrontierItem did it before the matcher: each whole url
+# segment and anchor word stemmed through a memoized stemmer, then
+# intersected with the stemmed terms
+def intersection_matcher(terms):
+    @lru_cache(maxsize=65536)
+    def stem(word):
+        return ps.stem(word)
+    stemmed_terms = frozenset(stem(term) for term in terms)
+
+    def count(url, anchor):
+        stemmed_url_terms = {stem(word) for word in url.split('/')}
+        stemmed_anchor_terms = {stem(word) for word in anchor.split(' ')}
+        return len(stemmed_terms.intersection(stemmed_url_terms)) + len(stemmed_terms.intersection(stemmed_anchor_terms))
+    return count
+
+# Urls and anchors like those of a crawl: titles made of topic words and
+# phrases, with the url segments unique to each page
+def make_links(num_links, seed=0):
+    rng = random.Random(seed)
+    links = []
+    for i in range(num_links):
+        title = rng.sample(words, 2) + rng.sample(phrases, 1)
+        rng.shuffle(title)
+        url = f"http://{rng.choice(domains)}/wiki/{'_'.join(' '.join(title).split())}_{i}"
+        links.append((url, " ".join(rng.sample(words, 2) + rng.sample(phrases, 1))))
+    return links
+
+def run(count, links):
+    start = timer()
+    total = sum(count(url, anchor) for url, anchor in links)
+    return total, timer() - start
+
+if __name__ == '__main__':
+    num_links = 200000
+    links = make_links(num_links)
+    before, before_time = run(intersection_matcher(related_terms), links)
+    matcher = TermMatcher(related_terms)
+    after, after_time = run(matcher.count, links)
+
+    print(f"{num_links} urls and anchors matched against {len(related_terms)} related terms")
+    print(f"intersection:  {before_time:.2f}s, {num_links / before_time:,.0f} links/sec, {before / num_links:.2f} matches per link")
+    print(f"Aho-Corasick:  {after_time:.2f}s, {num_links / after_time:,.0f} links/sec, {after / num_links:.2f} matches per link")
+    print(f"speedup: {before_time / after_time:.1f}x")
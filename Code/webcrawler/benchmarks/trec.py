@@ -0,0 +1,60 @@
+import os
+import random
+import resource
+import shutil
+from ..sink import format_document
+import sys
+import tempfile
+from timeit import default_timer as timer
+from ..trec import read_documents, results_files
+
+words = ["romney", "governor", "boston", "politics", "republican", "senate", "history", "elections", "massachusetts",
+         "economy", "campaigned", "the", "of", "and", "a", "in", "was", "running", "nominee", "presidential"]
+
+# Writes results files in the sink's format until they hold size bytes, and
+# returns the number of documents. Page texts span lines, and some contain
+# the markup the reader must not mistake for the end of a document
+def make_corpus(folder, size, docs_per_file=500, seed=0):
+    rng = random.Random(seed)
+    paragraphs = [" ".join(rng.choice(words) for _ in range(rng.randint(20, 200))) for _ in range(1000)]
+    paragraphs += ["see <TEXT> and </TEXT> tags", "</DOC> in a paragraph"]
+    written = 0
+    docs = 0
+    while written < size:
+        with open(os.path.join(folder, f"results_{docs // docs_per_file + 1}.txt"), 'w') as file:
+            for _ in range(docs_per_file):
+                text = "\n".join(rng.choice(paragraphs) for _ in range(rng.randint(5, 40)))
+                title = f"Page {docs}" if docs % 3 else ""
+                document = format_document(f"http://en.wikipedia.org/wiki/Page_{docs}", title, text)
+                file.write(document)
+                written += len(document)
+                docs += 1
+    return docs
+
+def max_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+if __name__ == '__main__':
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0 # Corpus size in GiB
+    folder = tempfile.mkdtemp()
+    try:
+        start = timer()
+        num_docs = make_corpus(folder, int(size * 2**30))
+        corpus_bytes = sum(os.path.getsize(path) for path in results_files(folder))
+        print(f"wrote {num_docs} documents, {corpus_bytes / 2**20:.0f} MiB in {timer() - start:.1f}s")
+
+        rss_before = max_rss_mib()
+        start = timer()
+        docs = 0
+        text_bytes = 0
+        for path in results_files(folder):
+            for url, title, text in read_documents(path):
+                assert url == f"http://en.wikipedia.org/wiki/Page_{docs}"
+                docs += 1
+                text_bytes += len(text)
+        elapsed = timer() - start
+        assert docs == num_docs
+        print(f"read {docs} documents in {elapsed:.1f}s: {corpus_bytes / 2**20 / elapsed:.1f} MiB/sec, {docs / elapsed:.0f} docs/sec")
+        print(f"peak RSS {rss_before:.0f} MiB before reading, {max_rss_mib():.0f} MiB after")
+    finally:
+        shutil.rmtree(folder)
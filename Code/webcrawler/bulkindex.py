@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import random
+import requests
+from .session import SessionPool
+import threading
+from time import sleep
+from timeit import default_timer as timer
+
+RETRY_STATUSES = (429, 503) # Responses that mean the cluster is busy, not that the request is wrong
+
+class BulkIndexError(Exception):
+    pass
+
+# Loads documents into an Elasticsearch index through the _bulk API. Documents
+# are serialized as they are added and sent in batches of at most max_docs
+# documents or max_bytes of NDJSON, by up to workers threads in parallel.
+# Requests rejected with 429 (or 503) are retried with exponential backoff,
+# and so are the single documents a bulk response rejects with 429. Used as a
+# context manager, refresh and replicas are turned off for the load and
+# restored afterwards
+class BulkIndexer:
+    def __init__(self, host, index, max_docs=1000, max_bytes=5 * 2**20, workers=4, max_retries=8, backoff=0.5, max_backoff=30, timeout=60, pool=None):
+        self.host = host.rstrip('/')
+        self.index_name = index
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.backoff = backoff # Seconds before the first retry, doubled for each one after
+        self.max_backoff = max_backoff
+        # Each worker thread keeps one connection to the cluster open
+        self.pool = pool or SessionPool(pool_connections=1, pool_maxsize=workers + 1, read_timeout=timeout)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(2 * workers) # Batches built but not yet sent, bounded so memory stays flat
+        self.lock = threading.Lock()
+        self.lines = []
+        self.batch_bytes = 0
+        self.futures = []
+        self.saved_settings = None
+        self.docs = 0 # Documents acknowledged by the cluster
+        self.failed = []  # (id, error) of documents that could not be indexed
+        self.retries = 0
+        self.requests = 0
+        self.started = None
+        self.elapsed = 0
+
+    def __enter__(self):
+        self.prepare()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Turns off refresh and replicas for the load, keeping the current values to restore
+    def prepare(self):
+        res = self._request("GET", f"/{self.index_name}/_settings")
+        settings = res.json()[self.index_name]["settings"]["index"]
+        self.saved_settings = {"refresh_interval": settings.get("refresh_interval"),
+                               "number_of_replicas": settings.get("number_of_replicas")}
+        self._request("PUT", f"/{self.index_name}/_settings", {"index": {"refresh_interval": "-1", "number_of_replicas": 0}})
+
+    # Adds a document to the current batch, sending the batch once it is full
+    def index(self, doc_id, document):
+        if self.started is None:
+            self.started = timer()
+        action = json.dumps({"index": {"_index": self.index_name, "_id": doc_id}})
+        source = json.dumps(document)
+        size = len(action) + len(source) + 2
+        if self.lines and (len(self.lines) // 2 >= self.max_docs or self.batch_bytes + size > self.max_bytes):
+            self.flush()
+        self.lines.append(action)
+        self.lines.append(source)
+        self.batch_bytes += size
+
+    # Sends the current batch. Blocks while the workers are behind
+    def flush(self):
+        if not self.lines:
+            return
+        lines, self.lines, self.batch_bytes = self.lines, [], 0
+        self.slots.acquire()
+        future = self.executor.submit(self._send, lines)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+
+    # Sends the last batch, waits for every batch and restores the index
+    # settings. Raises BulkIndexError if a request failed outright
+    def close(self):
+        self.flush()
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            self.executor.shutdown()
+            if self.started is not None:
+                self.elapsed = timer() - self.started
+            if self.saved_settings is not None:
+                self._request("PUT", f"/{self.index_name}/_settings", {"index": self.saved_settings})
+                self._request("POST", f"/{self.index_name}/_refresh")
+                self.saved_settings = None
+
+    def docs_per_sec(self):
+        return self.docs / self.elapsed if self.elapsed else 0.0
+
+    # Sends one batch, resending the documents rejected with 429 until they
+    # are accepted or max_retries is reached
+    def _send(self, lines):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self.lock:
+                    self.retries += 1
+                sleep(self._delay(attempt))
+            res = self._request("POST", "/_bulk", "\n".join(lines) + "\n", retry=True)
+            if res is None:
+                continue # The whole request was rejected, so send it again
+            body = res.json()
+            retry_lines = []
+            accepted = 0
+            failed = []
+            for i, item in enumerate(body["items"]):
+                result = next(iter(item.values()))
+                status = result.get("status", 500)
+                if status < 300:
+                    accepted += 1
+                elif status in RETRY_STATUSES:
+                    retry_lines += lines[2 * i:2 * i + 2]
+                else:
+                    failed.append((result.get("_id"), result.get("error")))
+            with self.lock:
+                self.docs += accepted
+                self.failed += failed
+            if not retry_lines:
+                return
+            lines = retry_lines
+        with self.lock:
+            self.failed += [(json.loads(action)["index"]["_id"], "retries exhausted") for action in lines[::2]]
+
+    # Exponential backoff with jitter, so parallel workers do not retry in step
+    def _delay(self, attempt):
+        return min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1)
+
+    # Sends a request to the cluster. With retry, a busy response returns None
+    # for the caller to retry instead of raising
+    def _request(self, method, path, body=None, retry=False):
+        headers = {}
+        if isinstance(body, str):
+            data = body.encode('utf-8')
+            headers["Content-Type"] = "application/x-ndjson"
+        elif body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers["Content-Type"] = "application/json"
+        else:
+            data = None
+        with self.lock:
+            self.requests += 1
+        try:
+            res = self.pool.session().request(method, self.host + path, data=data, headers=headers, timeout=self.pool.timeout)
+        except requests.exceptions.ConnectionError as e:
+            if retry:
+                return None
+            raise BulkIndexError(f"{method} {path} failed: {e}")
+        if retry and res.status_code in RETRY_STATUSES:
+            return None
+        if res.status_code >= 300:
+            raise BulkIndexError(f"{method} {path} returned {res.status_code}: {res.text[:200]}")
+        return res
@@ -0,0 +1,71 @@
+from functools import lru_cache
+import re
+from urllib.parse import urlparse, urlunparse, urljoin
+
+DUPLICATE_SLASHES = re.compile(r'([^:])//+')
+CACHE_SIZE = 1 << 16
+
+def canonicalize_url(url, base=None):
+    return _canonicalize(url, base)
+
+# Canonicalizes every href found on the page at base. The base url is parsed
+# once for the whole batch, and root-relative hrefs such as /wiki/Boston are
+# joined to it directly. All other hrefs go through the cached single-url path
+def canonicalize_many(hrefs, base):
+    base_url = urlparse(base)
+    root = None
+    if base_url.scheme in ('http', 'https') and base_url.netloc:
+        scheme = 'http' if base_url.scheme == 'https' else base_url.scheme
+        root = scheme + "://" + base_url.netloc.lower()
+
+    results = []
+    for href in hrefs:
+        if root is not None and _is_plain_root_relative(href):
+            # Drop the query and fragment, as canonicalize_url does
+            end = len(href)
+            for marker in ('?', '#'):
+                index = href.find(marker)
+                if index != -1 and index < end:
+                    end = index
+            results.append(DUPLICATE_SLASHES.sub(r'\1/', root + href[:end]))
+        else:
+            results.append(_canonicalize(href, base))
+    return results
+
+# True for hrefs like /wiki/Boston that urljoin would append to the base host
+# unchanged: an absolute path with no dot segments, whitespace or control characters
+def _is_plain_root_relative(href):
+    return href[:1] == '/' and href[1:2] != '/' and '/.' not in href and href.isprintable() and ' ' not in href
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _canonicalize(url, base):
+    # Parse the URL
+    parsed_url = urlparse(url)
+
+    # Convert scheme and host to lower case
+    scheme = parsed_url.scheme.lower()
+    domain = parsed_url.netloc.lower()
+
+    # Remove default ports
+    if (scheme == 'http' and parsed_url.port == 80) or (scheme == 'https' and parsed_url.port == 443):
+        domain = domain.split(':')[0]
+
+    # Make relative URLs absolute
+    if not parsed_url.netloc and base:
+        base_url = urlparse(base)
+        url = urljoin(base_url.geturl(), url)
+        parsed_url = urlparse(url)
+        scheme = parsed_url.scheme.lower()
+        domain = parsed_url.netloc.lower()
+
+    # Convert to http
+    if scheme == 'https':
+        scheme = 'http'
+
+    # Remove fragment
+    url = urlunparse((scheme, domain, parsed_url.path, parsed_url.params, '', ''))
+
+    # Remove duplicate slashes except after http:
+    url = DUPLICATE_SLASHES.sub(r'\1/', url)
+
+    return url
@@ -0,0 +1,146 @@
+from collections import defaultdict
+from .frontier import FrontierItem
+import json
+import os
+import sqlite3
+import threading
+from .trec import read_documents, results_files
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (url TEXT PRIMARY KEY, wavenum INTEGER, anchor TEXT);
+CREATE TABLE IF NOT EXISTS inlinks (url TEXT, inlink TEXT, PRIMARY KEY (url, inlink)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, title TEXT, text TEXT, outlinks TEXT);
+CREATE TABLE IF NOT EXISTS removed (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS excluded_domains (domain TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS domains (domain TEXT PRIMARY KEY, visits INTEGER, skipped INTEGER);
+CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY, next_fetch REAL);
+"""
+
+# Incremental crawl checkpoints in a SQLite file. The frontier journals every
+# change (new urls, inlinks, crawled pages, removed urls and domains), and each
+# save replays the journal since the previous save in a single transaction, so
+# the file always holds a complete crawl state as of some save. Per-domain visit
+# counts and host wait times are small and rewritten in full. Frontier scores
+# are not stored: they are recomputed from the stored wave, anchor and inlinks.
+# The title and text of crawled pages are only stored when there is no
+# DocumentSink, which otherwise already has them in the results files.
+# Pages the sink wrote after the last save are still in the results files,
+# so on load they count as crawled too
+class Checkpoint:
+    def __init__(self, path, interval=500, resume=False):
+        self.path = os.path.abspath(path)
+        self.interval = interval # Pages crawled between saves
+        self.resume = resume
+        self.lock = threading.Lock()
+        if not resume and os.path.exists(self.path):
+            os.remove(self.path) # A fresh crawl starts a fresh checkpoint
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL keeps the last committed save readable if the process dies mid-write
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    # Starts journaling frontier changes for the next save
+    def attach(self, crawler):
+        crawler.frontier.journal = []
+
+    # Writes the changes since the last save. Skipped if another thread is saving
+    def save(self, crawler, wait=False):
+        if not self.lock.acquire(blocking=wait):
+            return
+        try:
+            journal = crawler.frontier.take_journal()
+            if crawler.sink is not None:
+                crawler.sink.flush() # Every page in the checkpoint is then in the results files
+            domains = crawler.fetcher.domain_counts()
+            hosts = list(crawler.next_fetch.items())
+            with self.db:
+                self._write_journal(journal)
+                self.db.executemany("INSERT OR REPLACE INTO domains VALUES (?, ?, ?)", domains)
+                self.db.executemany("INSERT OR REPLACE INTO hosts VALUES (?, ?)", hosts)
+            crawler.robots.save()
+        finally:
+            self.lock.release()
+
+    def _write_journal(self, journal):
+        execute = self.db.execute
+        for entry in journal:
+            kind = entry[0]
+            if kind == "add":
+                _, url, in_link, wavenum, anchor = entry
+                execute("INSERT OR IGNORE INTO items VALUES (?, ?, ?)", (url, wavenum, anchor))
+                if in_link != "":
+                    execute("INSERT OR IGNORE INTO inlinks VALUES (?, ?)", (url, in_link))
+            elif kind == "inlink":
+                execute("INSERT OR IGNORE INTO inlinks VALUES (?, ?)", entry[1:])
+            elif kind == "crawl":
+                _, url, outgoings, text, title = entry
+                execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (url, title, text, json.dumps(list(outgoings))))
+            elif kind == "remove":
+                url = entry[1]
+                execute("DELETE FROM items WHERE url = ?", (url,))
+                execute("DELETE FROM inlinks WHERE url = ?", (url,))
+                execute("INSERT OR IGNORE INTO removed VALUES (?)", (url,))
+            elif kind == "exclude":
+                execute("INSERT OR IGNORE INTO excluded_domains VALUES (?)", (entry[1],))
+
+    # Rebuilds the frontier, visit counts, host wait times and crawl count
+    # of the passed crawler from the last save
+    def load(self, crawler):
+        with self.lock:
+            inlinks = defaultdict(list)
+            for url, inlink in self.db.execute("SELECT url, inlink FROM inlinks"):
+                inlinks[url].append(inlink)
+            if crawler.sink is None:
+                pages = {url: (title, text, outlinks) for url, title, text, outlinks in self.db.execute("SELECT url, title, text, outlinks FROM pages")}
+            else:
+                # The pages are already in the results files, so only which urls were crawled is loaded
+                pages = {url: None for url, in self.db.execute("SELECT url FROM pages")}
+                pages.update(dict.fromkeys(written_urls(crawler.sink.directory)))
+
+            items = []
+            matcher = crawler.frontier.matcher
+            for url, wavenum, anchor in self.db.execute("SELECT url, wavenum, anchor FROM items"):
+                item = FrontierItem(url, "", wavenum, anchor, term_matches=matcher.count(url, anchor))
+                for inlink in inlinks.get(url, ()):
+                    item.add_inlink(inlink)
+                crawled = url in pages
+                if crawled:
+                    if crawler.sink is None:
+                        title, text, outlinks = pages[url]
+                        item.process_URL({tuple(link) for link in json.loads(outlinks)}, text, title)
+                    crawler.visited_pages.add(url)
+                items.append((item, crawled))
+            # Pages written after the last save whose urls were found after it as well
+            saved = {item.url for item, crawled in items}
+            for url in pages:
+                if url not in saved:
+                    items.append((FrontierItem(url, "", 0, "", term_matches=matcher.count(url, "")), True))
+                    crawler.visited_pages.add(url)
+
+            removed = [url for url, in self.db.execute("SELECT url FROM removed")]
+            excluded = [domain for domain, in self.db.execute("SELECT domain FROM excluded_domains")]
+            crawler.frontier.restore(items, removed, excluded)
+
+            for domain, visits, skipped in self.db.execute("SELECT * FROM domains"):
+                crawler.fetcher.domain_visits[domain] = visits
+                if skipped:
+                    crawler.fetcher.skipped_domains.add(domain)
+            crawler.next_fetch.update(self.db.execute("SELECT host, next_fetch FROM hosts"))
+            crawler.count = len(pages)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+# Returns the urls of the documents in the results files of a directory. A
+# compressed file cut off by a crash is read up to where it ends
+def written_urls(directory):
+    urls = []
+    for path in results_files(directory):
+        try:
+            for url, title, text in read_documents(path):
+                urls.append(url)
+        except EOFError:
+            pass
+    return urls
@@ -0,0 +1,99 @@
+import os
+from .scoring import TRUSTED_SUFFIXES
+import sqlite3
+import tempfile
+
+# scoring.score as SQL over the stored features. The weights are bound in the
+# order weight_values returns them
+PRIORITY = "? * term_matches + ? * (1.0 / wavenum) + ? * trusted + ? * inlinks + ? * trusted_inlinks"
+
+def weight_values(weights):
+    return (weights["term_match"], weights["wave"], weights["trusted_domain"], weights["inlink"], weights["trusted_inlink"])
+
+# Disk tier of the Frontier. Holds queued urls that were spilled out of memory
+# in a SQLite file indexed by priority, so the best of them can be merged back
+# into the in-memory queue as it drains. Each url keeps its scoring features,
+# so inlinks found for it or new weights rescore it in place. The file is
+# scratch space: it is not made durable, and is deleted on close
+class ColdStore:
+    def __init__(self, directory=None):
+        fd, self.path = tempfile.mkstemp(prefix="frontier-", suffix=".db", dir=directory)
+        os.close(fd)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.executescript("""
+            CREATE TABLE items (url TEXT PRIMARY KEY, priority REAL, wavenum INTEGER, anchor TEXT, term_matches INTEGER,
+                                trusted INTEGER, inlinks INTEGER, trusted_inlinks INTEGER);
+            CREATE INDEX items_priority ON items (priority DESC);
+            CREATE TABLE inlinks (url TEXT, inlink TEXT, PRIMARY KEY (url, inlink)) WITHOUT ROWID;
+        """)
+        self.count = 0
+        self.best = None # Cached highest stored priority, None when it must be looked up
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, url):
+        return self.db.execute("SELECT 1 FROM items WHERE url = ?", (url,)).fetchone() is not None
+
+    # Writes FrontierItems to disk
+    def put_many(self, items):
+        self.db.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            ((item.url, item.priority, item.wavenum, item.anchor, item.term_matches, item.trusted,
+                              item.inlink_count, item.trusted_inlink_count) for item in items))
+        self.db.executemany("INSERT OR IGNORE INTO inlinks VALUES (?, ?)",
+                            ((item.url, link) for item in items for link in item.inlinks_set))
+        self.db.commit()
+        self.count += len(items)
+        self.best = None
+
+    # Records an inlink to a stored url, rescoring it with weights if the link is new
+    def add_inlink(self, url, link, weights):
+        if self.db.execute("INSERT OR IGNORE INTO inlinks VALUES (?, ?)", (url, link)).rowcount:
+            self.db.execute("UPDATE items SET inlinks = inlinks + 1, trusted_inlinks = trusted_inlinks + ? WHERE url = ?",
+                            (link.endswith(TRUSTED_SUFFIXES), url))
+            self.db.execute(f"UPDATE items SET priority = {PRIORITY} WHERE url = ?", (*weight_values(weights), url))
+            self.best = None
+
+    # Rescores every stored url with new weights
+    def set_weights(self, weights):
+        self.db.execute(f"UPDATE items SET priority = {PRIORITY}", weight_values(weights))
+        self.db.commit()
+        self.best = None
+
+    # Returns the highest stored priority
+    def best_priority(self):
+        if self.best is None:
+            self.best = self.db.execute("SELECT MAX(priority) FROM items").fetchone()[0]
+        return self.best
+
+    # Removes and returns up to n of the highest priority urls, as (url, wavenum,
+    # anchor, term_matches, inlink count, trusted inlink count, inlinks) tuples
+    def take(self, n):
+        rows = self.db.execute("SELECT url, wavenum, anchor, term_matches, inlinks, trusted_inlinks FROM items "
+                               "ORDER BY priority DESC LIMIT ?", (n,)).fetchall()
+        taken = []
+        for row in rows:
+            inlinks = [link for link, in self.db.execute("SELECT inlink FROM inlinks WHERE url = ?", (row[0],))]
+            taken.append(row + (inlinks,))
+        self._delete([(row[0],) for row in rows])
+        return taken
+
+    # Removes a stored url. Returns whether it was stored
+    def remove(self, url):
+        if url not in self:
+            return False
+        self._delete([(url,)])
+        return True
+
+    def _delete(self, keys):
+        self.db.executemany("DELETE FROM items WHERE url = ?", keys)
+        self.db.executemany("DELETE FROM inlinks WHERE url = ?", keys)
+        self.db.commit()
+        self.count -= len(keys)
+        self.best = None
+
+    def close(self):
+        self.db.close()
+        os.remove(self.path)
@@ -0,0 +1,218 @@
+from .canonicalizeurls import canonicalize_url
+from .dedupe import DEDUPE_POLICIES, NearDuplicateIndex
+from .download import BodyReader
+from .extractors import get_extractor
+from .fetcher import Fetcher
+from .frontier import *
+from .robotscache import RobotsCache
+from .scheduler import HostScheduler
+from .session import SessionPool
+from .stats import CrawlStats
+import sys
+import threading
+from urllib.parse import urlparse
+from .urlseen import URLSeenSet
+
+'''
+Core crawler state shared by every execution backend: the frontier, the
+robots.txt cache, the fetcher and the parser. Backends subclass Crawler and
+implement crawl(), driving crawl_url() from one thread, many threads or an
+event loop
+'''
+class Crawler:
+    name = None
+    default_concurrency = 1
+    partitionable = True # Whether the backend takes its urls from the HostScheduler, which a partitioned crawl needs
+
+    def __init__(self, seeds, related_terms, robots_cache_path=None, session=None, single_request=True, body_reader=None, extractor="streaming", parse_pool=None, checkpoint=None, frontier_capacity=None, spill_dir=None, sink=None, router=None, weights=None, dedupe=None, quota=None):
+        self.frontier = Frontier(related_terms, frontier_capacity, spill_dir, weights) # Queued urls beyond frontier_capacity spill to a file in spill_dir
+        self.session = session or SessionPool() # Pooled keep-alive connections shared by all threads
+        self.robots = RobotsCache(path=robots_cache_path, session=self.session) # Shared robots.txt cache, optionally persisted to disk
+        self.stats = CrawlStats()
+        self.extractor = get_extractor(extractor) # Parses text, title and outlinks from page contents
+        self.parse_pool = parse_pool # Optional ParsePool that parses pages in separate processes
+        self.fetcher = Fetcher(self.session, body_reader or BodyReader(stats=self.stats), self.parse, self.stats,
+                               on_domain_capped=self.frontier.remove_domain, single_request=single_request)
+        self.visited_pages = URLSeenSet()
+        self.next_fetch = {} # Earliest time each host may be contacted again, shared with the scheduler
+        self.lock = threading.Lock()
+        self.scheduler = None
+        self.num_hits = 0
+        self.count = 0
+        self.checkpoint = checkpoint # Optional Checkpoint the crawl state is periodically saved to
+        self.sink = sink # Optional DocumentSink crawled pages are streamed to instead of kept in memory
+        self.router = router # Optional Router of a partitioned crawl, for outlinks on hosts this crawler does not own
+        self.frontier.router = router
+        self.quota = quota # Optional PageQuota shared by the partitions of a partitioned crawl, for num_hits over all of them
+        if dedupe is not None and dedupe not in DEDUPE_POLICIES:
+            raise ValueError(f"Unknown dedupe policy: {dedupe}")
+        self.dedupe = dedupe # "mark" or "drop" near duplicate pages, or None to record every page
+        self.duplicates = NearDuplicateIndex() if dedupe else None # Pages crawled so far, for near duplicate lookups
+        if checkpoint is not None and checkpoint.resume:
+            checkpoint.load(self) # The saved frontier already holds the seeds
+            checkpoint.attach(self)
+        else:
+            if checkpoint is not None:
+                checkpoint.attach(self)
+            for url in seeds:
+                canonicalized = canonicalize_url(url)
+                self.frontier.add_url(canonicalized, "", 1)
+
+    '''
+    Runs the crawler until num_hits pages have been crawled or the frontier
+    is exhausted, and returns the crawled pages
+    '''
+    def crawl(self, num_hits, concurrency=None):
+        raise NotImplementedError
+
+    '''
+    Sets the crawl target and creates the HostScheduler that hands out urls
+    whose host may be contacted now. num_hits counts pages crawled before a
+    resume, so a resumed crawl stops at the same total. In a partitioned
+    crawl, an empty frontier does not end the crawl, as other partitions may
+    still send urls
+    '''
+    def start(self, num_hits):
+        self.num_hits = num_hits
+        self.scheduler = HostScheduler(self.frontier, self.robots, next_fetch=self.next_fetch, wait_when_empty=self.router is not None)
+
+    '''
+    Saves the robots.txt cache and a final checkpoint, deletes the frontier's
+    spill file and returns the crawled pages. Pages written to a sink are not
+    returned
+    '''
+    def finish(self):
+        self.save_checkpoint(wait=True)
+        self.robots.save()
+        self.frontier.close()
+        return self.frontier.get_crawled_pages()
+
+    '''
+    Saves the crawl state to the checkpoint, if there is one
+    '''
+    def save_checkpoint(self, wait=False):
+        if self.checkpoint is not None:
+            self.checkpoint.save(self, wait)
+
+    '''
+    Takes one url from the scheduler and crawls it. Returns False when there
+    is nothing left to crawl
+    '''
+    def step(self):
+        url = self.scheduler.get_url()
+        if url is None:
+            return False  # If the frontier is exhausted, stop crawling
+        contacted = True
+        try:
+            contacted = self.crawl_url(url)
+        finally:
+            self.scheduler.release(url, contacted)
+        return True
+
+    '''
+    Crawls a single url: checks it against the visited pages, the skipped
+    domains and robots.txt, then fetches and parses it. Returns whether the
+    host was contacted
+    '''
+    def crawl_url(self, url):
+        domain = urlparse(url).netloc.lower()
+        if url in self.visited_pages: # If we have already visited this page
+            return False
+        if domain in self.fetcher.skipped_domains: # If we have met the cap on visits to this domain
+            self.reject(url, "rejected_skipped_domain")
+            return False
+        if not self.check_robots(url): # If the robots.txt file does not allow crawling
+            self.reject(url, "rejected_by_robots")
+            return False
+
+        page = self.fetcher.fetch(url)
+        if page is None: # If the page is not of valid format for crawling
+            self.reject(url, "rejected_invalid_page")
+        else:
+            outlinks, text_data, title = page
+            self.record_page(url, outlinks, text_data, title)
+        return True
+
+    '''
+    Adds a crawled page to the frontier, or to the sink if there is one,
+    and prints it to terminal. Closes the scheduler once num_hits pages have
+    been crawled, and saves a checkpoint every checkpoint.interval pages.
+    The crawler's lock only covers claiming a place in the count, so the
+    frontier, sink and stats, which each guard themselves, are updated
+    without holding it. In a partitioned crawl the place is also claimed
+    from the quota shared by the partitions, and the crawl stops once it
+    is used up.
+    With dedupe set, the page is first looked up among the pages crawled so
+    far. A near duplicate is dropped with "drop". With "mark" it is recorded
+    and counted, but its outlinks, which the original already added, are not
+    added to the frontier again
+    '''
+    def record_page(self, url, outlinks, text_data, title):
+        original = None
+        if self.duplicates is not None:
+            original = self.duplicates.check(url, text_data)
+            if original is not None and self.dedupe == "drop":
+                self.reject(url, "rejected_near_duplicate")
+                return
+        with self.lock:
+            if self.count >= self.num_hits or not self.visited_pages.add(url):
+                return
+            claimed = self.quota is None or self.quota.claim()
+            if claimed:
+                self.count += 1
+            count = self.count
+        if (not claimed or count >= self.num_hits) and self.scheduler is not None:
+            self.scheduler.close()
+        if not claimed:
+            return # The other partitions crawled the rest of the pages
+        if self.sink is not None and text_data != "":
+            # Queued before the frontier journals the page, so a checkpoint never holds a page the sink has not seen.
+            # Pages without text are left out, as get_crawled_pages leaves them out of the returned pages
+            self.sink.write(url, title, text_data, outlinks)
+        self.frontier.processResponse(url, outlinks, text_data, title, keep_contents=self.sink is None, expand=original is None)
+        self.stats.incr("pages_crawled")
+        # One write per line, since print writes the text and the newline
+        # separately and lines from other threads can land in between
+        if original is not None:
+            sys.stdout.write(f"{count} {url} (near duplicate of {original})\n")
+        else:
+            sys.stdout.write(f"{count} {url}\n")
+        if self.checkpoint is not None and count % self.checkpoint.interval == 0:
+            self.save_checkpoint()
+
+    '''
+    Drops a url that will not be crawled and counts the reason
+    '''
+    def reject(self, url, reason):
+        self.frontier.remove_url(url)
+        self.stats.incr(reason)
+
+    '''
+    Returns the crawl counters along with the connection reuse of the
+    session and, with dedupe set, the near duplicate lookup counters
+    '''
+    def get_stats(self):
+        extra = self.session.connection_stats()
+        if self.duplicates is not None:
+            extra.update(self.duplicates.stats())
+        return self.stats.snapshot(**extra)
+
+    '''
+    Checks the robots.txt file for the passed url to determine
+    if the page can be crawled. Wait times between requests to
+    the same host are enforced by the HostScheduler
+    '''
+    def check_robots(self, url):
+        try:
+            # Cached per host, so robots.txt is only fetched once per TTL
+            return self.robots.can_fetch(url)
+        except Exception as e:
+            return False
+
+    '''
+    Parses page contents on the parse pool if there is one, or on the calling thread
+    '''
+    def parse(self, content, url, encoding=None):
+        if self.parse_pool is not None:
+            return self.parse_pool.parse(content, url, encoding)
+        return self.extractor.extract(content, url, encoding)
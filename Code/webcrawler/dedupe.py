@@ -0,0 +1,151 @@
+from functools import lru_cache
+import hashlib
+import numpy as np
+import re
+import threading
+from timeit import default_timer as timer
+
+DEDUPE_POLICIES = ("mark", "drop")
+WORD = re.compile(r"\w+")
+# Multiplier that chains token hashes into shingle hashes, and the constants of
+# the splitmix64 finalizer that mixes them so every bit depends on every token
+SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX2 = np.uint64(0x94D049BB133111EB)
+BLOCK = 2048 # Shingles hashed at once, bounding the memory of a long page's signature
+
+# Stable 64-bit hash of a token. Unlike hash() it is the same in every
+# process, so signatures can be compared across runs and partitions
+@lru_cache(maxsize=1 << 18)
+def token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+# Distinct 64-bit hashes of the runs of shingle_size words in a text, or of
+# all its words if it has fewer
+def shingle_hashes(text, shingle_size=3):
+    tokens = WORD.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, np.uint64)
+    hashes = np.fromiter(map(token_hash, tokens), np.uint64, len(tokens))
+    count = max(1, len(hashes) - shingle_size + 1)
+    shingles = hashes[:count].copy()
+    for offset in range(1, min(shingle_size, len(hashes))):
+        shingles = shingles * SHINGLE_MULTIPLIER + hashes[offset:offset + count]
+    shingles ^= shingles >> np.uint64(30)
+    shingles *= MIX1
+    shingles ^= shingles >> np.uint64(27)
+    shingles *= MIX2
+    shingles ^= shingles >> np.uint64(31)
+    return np.unique(shingles)
+
+# MinHash signatures of texts. Each of num_hashes random multiply-add hash
+# functions maps the shingle hashes of a text, keeping the top 32 bits, and
+# the signature holds the minimum under each. The fraction of positions at
+# which two signatures agree estimates the Jaccard similarity of the two
+# texts' shingle sets
+class MinHasher:
+    def __init__(self, num_hashes=128, shingle_size=3, seed=1):
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(0, 2**63, num_hashes, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.increments = rng.integers(0, 2**63, num_hashes, dtype=np.uint64)
+        self.shingle_size = shingle_size
+
+    # Returns the signature of a text, or None if it has no words
+    def signature(self, text):
+        shingles = shingle_hashes(text, self.shingle_size)
+        if len(shingles) == 0:
+            return None
+        signature = None
+        for start in range(0, len(shingles), BLOCK):
+            block = np.multiply.outer(shingles[start:start + BLOCK], self.multipliers)
+            block += self.increments
+            block >>= np.uint64(32)
+            minimum = block.min(axis=0)
+            signature = minimum if signature is None else np.minimum(signature, minimum)
+        return signature.astype(np.uint32)
+
+# Finds pages whose text is a near duplicate of a page already seen: a
+# mirror, a printable or mobile view, or the same article under another url.
+# Two pages are near duplicates when the MinHash estimate of the Jaccard
+# similarity of their word shingles is at least threshold. Signatures are
+# indexed for lookup by locality sensitive hashing: they are cut into bands
+# of rows values, and a lookup only compares the pages that match it on a
+# whole band. With the defaults, pages 80% similar share a band 95% of the
+# time, and pages 50% similar 6% of the time. Lookups and additions are
+# atomic, so of two copies crawled at once exactly one is the original
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.8, bands=16, rows=8, shingle_size=3):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.hasher = MinHasher(bands * rows, shingle_size)
+        self.tables = [{} for _ in range(bands)] # Band bytes to the ids of the pages that have them, per band
+        self.signatures = [] # Signature of each indexed page, by id
+        self.urls = [] # Url of each indexed page, by id
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.duplicates = 0
+        self.signature_seconds = 0.0
+        self.lookup_seconds = 0.0
+
+    def __len__(self):
+        return len(self.urls)
+
+    # Returns the url of an earlier page that text is a near duplicate of.
+    # Otherwise records the page under url and returns None. Texts with no
+    # words are neither checked nor recorded
+    def check(self, url, text):
+        start = timer()
+        signature = self.hasher.signature(text)
+        signed = timer()
+        if signature is None:
+            return None
+        keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+        with self.lock:
+            lookup_start = timer()
+            original = self._find(signature, keys, url)
+            if original is None:
+                self._add(signature, keys, url)
+            else:
+                self.duplicates += 1
+            self.lookups += 1
+            self.signature_seconds += signed - start
+            self.lookup_seconds += timer() - lookup_start
+        return original
+
+    def _find(self, signature, keys, url):
+        compared = set()
+        for table, key in zip(self.tables, keys):
+            for candidate in table.get(key, ()):
+                if candidate in compared:
+                    continue
+                compared.add(candidate)
+                if self.urls[candidate] == url:
+                    continue
+                if np.count_nonzero(self.signatures[candidate] == signature) >= self.threshold * len(signature):
+                    return self.urls[candidate]
+        return None
+
+    def _add(self, signature, keys, url):
+        page = len(self.urls)
+        self.signatures.append(signature)
+        self.urls.append(url)
+        for table, key in zip(self.tables, keys):
+            table.setdefault(key, []).append(page)
+
+    # Returns the lookup counters, with the share of pages found to be near
+    # duplicates and the mean signature and lookup times in microseconds
+    def stats(self):
+        with self.lock:
+            stats = {"dedupe_lookups": self.lookups, "near_duplicates": self.duplicates,
+                     "dedupe_signature_seconds": self.signature_seconds, "dedupe_lookup_seconds": self.lookup_seconds}
+        return add_rates(stats)
+
+# Adds the dedupe rate and mean times to stats holding the dedupe counters,
+# which may be summed over several crawls
+def add_rates(stats):
+    lookups = stats["dedupe_lookups"]
+    stats["dedupe_rate"] = stats["near_duplicates"] / lookups if lookups else 0
+    stats["dedupe_signature_us"] = 1e6 * stats["dedupe_signature_seconds"] / lookups if lookups else 0
+    stats["dedupe_lookup_us"] = 1e6 * stats["dedupe_lookup_seconds"] / lookups if lookups else 0
+    return stats
@@ -0,0 +1,157 @@
+import asyncio
+import re
+import socket
+import threading
+from time import monotonic
+from urllib3.exceptions import ReadTimeoutError
+
+CHARSET_HEADER = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+CHARSET_META = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+
+# Returns the charset named by a Content-Type header or, failing
+# that, by a <meta> tag near the start of the page, or None
+def detect_charset(headers, content):
+    match = CHARSET_HEADER.search(headers.get("content-type", ""))
+    if match:
+        return match.group(1).lower()
+    match = CHARSET_META.search(content[:4096])
+    if match:
+        return match.group(1).decode("ascii").lower()
+    return None
+
+# Streams response bodies in chunks into a reusable per-thread buffer,
+# enforcing a maximum body size and a total download deadline. Bodies that
+# go over either cap are kept up to that point when policy is "truncate",
+# or dropped when policy is "skip". Each decision is counted in stats
+class BodyReader:
+    def __init__(self, max_bytes=2 * 1024 * 1024, deadline=30, policy="truncate", chunk_size=64 * 1024, stats=None):
+        if policy not in ("truncate", "skip"):
+            raise ValueError(f"Unknown oversize policy: {policy}")
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        self.policy = policy
+        self.chunk_size = chunk_size
+        self.stats = stats
+        self.local = threading.local()
+
+    # Reads the body of a streamed requests response. Returns (content, charset),
+    # or (None, None) if the body was skipped. The response is left to the caller to close.
+    # Reads return whatever has arrived rather than waiting for a whole chunk, and the
+    # socket read timeout is lowered to the time left, so a server trickling out bytes
+    # cannot hold the read past the deadline
+    def read(self, res):
+        if self._declared_too_large(res.headers):
+            return None, None
+
+        raw = res.raw
+        read = getattr(raw, "read1", None) or raw.read
+        sock = getattr(getattr(raw, "connection", None), "sock", None)
+        timeout = sock.gettimeout() if sock is not None else None
+        body = self._body()
+        deadline = monotonic() + self.deadline
+        try:
+            while True:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    if not body.over_deadline():
+                        return None, None
+                    break
+                limited = sock is not None and (timeout is None or remaining < timeout)
+                if limited:
+                    sock.settimeout(remaining)
+                try:
+                    chunk = read(self.chunk_size, decode_content=True)
+                except (ReadTimeoutError, socket.timeout):
+                    if not limited:
+                        raise
+                    if not body.over_deadline():
+                        return None, None
+                    break
+                if not chunk or not body.add(chunk):
+                    break
+        finally:
+            if sock is not None and sock.fileno() != -1: # A timed out read closes the connection
+                sock.settimeout(timeout)
+        return body.finish(res.headers)
+
+    # Reads the body of an aiohttp response under the same caps. Returns (content, charset),
+    # or (None, None) if the body was skipped. Reads on one event loop interleave,
+    # so each gets its own buffer rather than the thread's
+    async def read_async(self, res):
+        if self._declared_too_large(res.headers):
+            return None, None
+
+        body = _Body(self, bytearray())
+        deadline = monotonic() + self.deadline
+        while True:
+            remaining = deadline - monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                chunk = await asyncio.wait_for(res.content.readany(), remaining)
+            except asyncio.TimeoutError:
+                if not body.over_deadline():
+                    return None, None
+                break
+            if not chunk or not body.add(chunk):
+                break
+        return body.finish(res.headers)
+
+    # Skips a body whose Content-Length is over the cap before any of it is read
+    def _declared_too_large(self, headers):
+        declared = headers.get("content-length")
+        if self.policy == "skip" and declared and declared.isdigit() and int(declared) > self.max_bytes:
+            self._count("body_skipped_too_large")
+            return True
+        return False
+
+    def _body(self):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            buffer = self.local.buffer = bytearray() # Grows to the largest body read, then is reused
+        return _Body(self, buffer)
+
+    def _count(self, name, amount=1):
+        if self.stats is not None:
+            self.stats.incr(name, amount)
+
+# A body being read into a BodyReader's buffer
+class _Body:
+    def __init__(self, reader, buffer):
+        self.reader = reader
+        self.buffer = buffer
+        self.size = 0
+        self.skipped = False
+
+    # Appends a chunk. Returns False once the body is over the size cap
+    def add(self, chunk):
+        reader = self.reader
+        if self.size + len(chunk) > reader.max_bytes:
+            if reader.policy == "skip":
+                reader._count("body_skipped_too_large")
+                self.skipped = True
+                return False
+            chunk = chunk[:reader.max_bytes - self.size]
+            reader._count("body_truncated_too_large")
+            self.buffer[self.size:self.size + len(chunk)] = chunk
+            self.size += len(chunk)
+            return False
+        self.buffer[self.size:self.size + len(chunk)] = chunk
+        self.size += len(chunk)
+        return True
+
+    # Counts a body that ran past the deadline. Returns False if it is skipped
+    def over_deadline(self):
+        if self.reader.policy == "skip":
+            self.reader._count("body_skipped_deadline")
+            return False
+        self.reader._count("body_truncated_deadline")
+        return True
+
+    # Returns (content, charset), or (None, None) if the body was skipped
+    def finish(self, headers):
+        if self.skipped:
+            return None, None
+        content = bytes(memoryview(self.buffer)[:self.size])
+        self.reader._count("body_bytes", self.size)
+        return content, detect_charset(headers, content)
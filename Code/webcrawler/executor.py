@@ -0,0 +1,131 @@
+import argparse
+from .backends import BACKENDS, get_backend
+from .checkpoint import Checkpoint
+from .dedupe import DEDUPE_POLICIES
+from datetime import timedelta
+from .extractors import EXTRACTORS
+import os
+from .parsepool import ParsePool
+from .partition import crawl_partitioned
+from .scoring import load_weights
+from .sink import COMPRESSIONS, FSYNC_POLICIES, DocumentSink
+from .stats import format_stats
+from timeit import default_timer as timer
+
+seeds = ["http://en.wikipedia.org/wiki/Politics_of_Massachusetts",
+         "http://en.wikipedia.org/wiki/Mitt_Romney",
+         "http://en.wikipedia.org/wiki/Governorship_of_Mitt_Romney",
+         "https://malegislature.gov/Legislators/Leadership",
+         "https://www.wbur.org/news/2023/09/07/boston-beacon-hill-government-field-guide"]
+related_terms = ["Mitt Romney", "Republican", "Massachussetts", "Governor", "New England", "MA", "Romney"]
+
+# Reads one entry per line from a file, skipping blank lines
+def read_lines(path):
+    with open(path) as file:
+        return [line.strip() for line in file if line.strip()]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="webcrawler", description="Runs a focused crawl and writes the crawled pages to the results directory")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="threaded", help="execution backend (default: threaded)")
+    parser.add_argument("--num-hits", type=int, default=30100, help="number of documents to crawl")
+    parser.add_argument("--concurrency", type=int, default=None, help="worker threads or in-flight requests (default: the backend's own)")
+    parser.add_argument("--results-dir", default="Results", help="directory the results and robots.txt cache are written to")
+    parser.add_argument("--seeds", help="file with one seed url per line (default: the built-in seeds)")
+    parser.add_argument("--related-terms", help="file with one related term per line (default: the built-in terms)")
+    parser.add_argument("--extractor", choices=sorted(EXTRACTORS), default="streaming", help="HTML extractor (default: streaming)")
+    parser.add_argument("--parse-processes", type=int, default=0, help="parse pages on a pool of this many processes (default: parse on the crawling threads)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="documents per results file (default: 500)")
+    parser.add_argument("--compression", choices=[name or "none" for name in COMPRESSIONS], default="none", help="compress the results files (default: none)")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default="chunk", help="when results files are synced to disk (default: chunk)")
+    parser.add_argument("--frontier-capacity", type=int, default=None, help="most queued urls held in memory; lower priority urls spill to a file in the results directory (default: no limit)")
+    parser.add_argument("--weights", help="JSON file of frontier scoring weights; weights it leaves out keep their defaults (default: the built-in weights)")
+    parser.add_argument("--dedupe", choices=["off", *DEDUPE_POLICIES], default="off", help="find pages that are near duplicates of pages already crawled, and record them without following their links (mark) or skip them (drop) (default: off)")
+    parser.add_argument("--checkpoint-interval", type=int, default=500, help="pages crawled between checkpoints, 0 to disable (default: 500)")
+    parser.add_argument("--resume", action="store_true", help="resume the crawl from the checkpoint in the results directory")
+    parser.add_argument("--partitions", type=int, default=1, help="split the crawl over this many processes, each owning a share of the hosts; partitioned crawls are not checkpointed (default: 1)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    backend = get_backend(args.backend)
+    crawl_seeds = read_lines(args.seeds) if args.seeds else seeds
+    crawl_terms = read_lines(args.related_terms) if args.related_terms else related_terms
+    concurrency = args.concurrency or backend.default_concurrency
+    compression = None if args.compression == "none" else args.compression
+    weights = load_weights(args.weights) if args.weights else None
+    dedupe = None if args.dedupe == "off" else args.dedupe
+
+    if args.partitions > 1:
+        if args.resume:
+            raise SystemExit("A partitioned crawl cannot be resumed")
+        if not backend.partitionable:
+            raise SystemExit(f"The {args.backend} backend cannot run a partitioned crawl")
+        # Each partition writes to its own directory in the results directory,
+        # and their results files and link graphs are merged once all have stopped
+        os.makedirs(args.results_dir, exist_ok=True)
+        start = timer()
+        try:
+            stats = crawl_partitioned(args.partitions, crawl_seeds, crawl_terms, args.num_hits, args.results_dir, backend=args.backend,
+                                      concurrency=concurrency, extractor=args.extractor, chunk_size=args.chunk_size, compression=compression,
+                                      fsync=args.fsync, frontier_capacity=args.frontier_capacity, weights=weights,
+                                      dedupe=dedupe)
+        except RuntimeError as e:
+            raise SystemExit(f"Partitioned crawl failed: {e}")
+        print(timedelta(seconds=timer()-start))
+        print(format_stats(stats))
+        return
+
+    parse_pool = ParsePool(args.extractor, processes=args.parse_processes) if args.parse_processes else None
+
+    # Initialize the crawler with the provided seeds and related terms.
+    # robots.txt results are cached across runs in the results directory,
+    # and the crawl state is checkpointed there so it can be resumed
+    os.makedirs(args.results_dir, exist_ok=True)
+    checkpoint_path = os.path.join(args.results_dir, 'checkpoint.db')
+    if args.resume and not os.path.exists(checkpoint_path):
+        raise SystemExit(f"No checkpoint to resume from at {checkpoint_path}")
+    checkpoint = None
+    if args.checkpoint_interval > 0 or args.resume:
+        checkpoint = Checkpoint(checkpoint_path, interval=args.checkpoint_interval or args.num_hits, resume=args.resume)
+    sink = DocumentSink(os.path.abspath(args.results_dir), chunk_size=args.chunk_size, fsync=args.fsync,
+                        compression=compression, resume=args.resume)
+    c = backend(crawl_seeds, crawl_terms, robots_cache_path=os.path.join(args.results_dir, 'robots_cache.json'),
+                extractor=args.extractor, parse_pool=parse_pool, checkpoint=checkpoint,
+                frontier_capacity=args.frontier_capacity, spill_dir=os.path.abspath(args.results_dir), sink=sink,
+                weights=weights, dedupe=dedupe)
+    if args.resume:
+        print(f"Resumed from checkpoint with {c.count} crawled pages")
+    os.chdir(args.results_dir)
+    start = timer()
+
+    try:
+        # Start the crawler. First argument is the number of documents to crawl,
+        # second argument is the number of threads or in-flight requests.
+        # Crawled pages are written by the sink as they arrive: results_{chunk number}.txt
+        # holds the contents of each crawled URL, and the graph directory the
+        # directed edges between URLs
+        c.crawl(args.num_hits, concurrency)
+    except Exception as e:
+        # If an exception occurs, print the exception. The pages crawled so far
+        # are already in the results files, so write the uncrawled items and
+        # their inlinks to a new file; these can be used as seeds in later runs
+        print(e)
+        c.save_checkpoint(wait=True)
+        with open("unprocessed_links.txt", 'w') as file:
+            for url, item in list(c.frontier.url_map.items()):
+                if url not in c.visited_pages:
+                    file.write(f"{url} {item.inlinks_set}\n")
+    finally:
+        sink.close()
+        if parse_pool is not None:
+            parse_pool.shutdown()
+        if checkpoint is not None:
+            checkpoint.close()
+        c.frontier.close()
+
+    end = timer()
+    print(timedelta(seconds=end-start))
+    print(format_stats(c.get_stats()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+from bs4 import BeautifulSoup
+from .canonicalizeurls import canonicalize_many, canonicalize_url
+from .download import detect_charset
+from html import unescape
+from html.entities import html5
+from html.parser import HTMLParser
+
+'''
+Extractors turn the contents of an HTML page into the crawler's
+(outlinks, text, title) result, where outlinks is a set of canonicalized
+(url, anchor text) pairs and text is the text of every <p> joined by spaces.
+Each extractor has an extract(content, url, encoding=None) method
+'''
+
+# Reference extractor. Builds a full BeautifulSoup tree and searches it
+class SoupExtractor:
+    name = "soup"
+
+    def extract(self, content, url, encoding=None):
+        soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+
+        text_data = " ".join([p.get_text() for p in soup.find_all('p')]).strip()
+        title_tag = soup.find('title')
+        title = ""
+        if title_tag:
+            title = title_tag.get_text()
+
+        outlinks = set()
+        for link in soup.find_all('a', href=True):
+            new_link = link['href']
+            anchor_text = link.get_text()
+            canonicalized = canonicalize_url(new_link, url)
+            outlinks.add((canonicalized, anchor_text))
+
+        return outlinks, text_data, title
+
+# Single-pass extractor. Collects paragraph text, the title and (href, anchor)
+# pairs straight from html.parser events without building a tree. Mirrors
+# how BeautifulSoup's html.parser builder nests tags, collapses whitespace-only
+# strings and skips script, style and template text, so its output matches
+# SoupExtractor's
+class StreamingExtractor:
+    name = "streaming"
+
+    def extract(self, content, url, encoding=None):
+        if isinstance(content, bytes):
+            content = decode_html(content, encoding)
+        parser = _StreamingParser()
+        parser.feed(content)
+        parser.close()
+
+        text_data = " ".join(["".join(paragraph) for paragraph in parser.paragraphs]).strip()
+        title = "".join(parser.title) if parser.title is not None else ""
+        canonicalized = canonicalize_many([href for href, _ in parser.links], url)
+        outlinks = {(link, "".join(anchor)) for link, (_, anchor) in zip(canonicalized, parser.links)}
+        return outlinks, text_data, title
+
+EXTRACTORS = {
+    SoupExtractor.name: SoupExtractor,
+    StreamingExtractor.name: StreamingExtractor,
+}
+
+# Returns a new extractor of the given name
+def get_extractor(name):
+    try:
+        return EXTRACTORS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown extractor: {name}")
+
+# Decodes page bytes using the passed or declared charset,
+# falling back to UTF-8 and then Windows-1252
+def decode_html(content, encoding=None):
+    encoding = encoding or detect_charset({}, content)
+    if encoding:
+        try:
+            return content.decode(encoding, errors="replace")
+        except LookupError:
+            pass
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode("windows-1252", errors="replace")
+
+# Same tag sets BeautifulSoup's HTML tree builder uses
+EMPTY_ELEMENT_TAGS = {'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image',
+                      'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source',
+                      'spacer', 'track', 'wbr'}
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+NON_TEXT_TAGS = {'rt', 'rp', 'style', 'script', 'template'}
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+class _StreamingParser(HTMLParser):
+    def __init__(self):
+        HTMLParser.__init__(self, convert_charrefs=False)
+        self.stack = [] # Open tags as (name, collector or None)
+        self.open_counts = {}
+        self.active = [] # Collectors of open <p>, <a href> and <title> tags, in stack order
+        self.non_text_depth = 0
+        self.preserve_depth = 0
+        self.already_closed_empty = []
+        self.pending = []
+        self.paragraphs = []
+        self.links = []
+        self.title = None
+
+    # Ends the current run of text and hands it to every open collector
+    def _flush(self, is_text=True):
+        if not self.pending:
+            return
+        data = "".join(self.pending)
+        self.pending = []
+        if not self.preserve_depth and not data.strip(ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        if is_text and not self.non_text_depth:
+            for collector in self.active:
+                collector.append(data)
+
+    def _pop(self):
+        name, collector = self.stack.pop()
+        self.open_counts[name] -= 1
+        if name in NON_TEXT_TAGS:
+            self.non_text_depth -= 1
+        if name in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth -= 1
+        if collector is not None:
+            self.active.pop()
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self._flush()
+        collector = None
+        if tag == 'p':
+            collector = []
+            self.paragraphs.append(collector)
+        elif tag == 'a':
+            attr_dict = {key: ("" if value is None else value) for key, value in attrs}
+            if 'href' in attr_dict:
+                collector = []
+                self.links.append((attr_dict['href'], collector))
+        elif tag == 'title' and self.title is None:
+            collector = []
+            self.title = collector
+
+        self.stack.append((tag, collector))
+        self.open_counts[tag] = self.open_counts.get(tag, 0) + 1
+        if tag in NON_TEXT_TAGS:
+            self.non_text_depth += 1
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+        if collector is not None:
+            self.active.append(collector)
+
+        if tag in EMPTY_ELEMENT_TAGS and handle_empty_element:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.already_closed_empty.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self.already_closed_empty:
+            self.already_closed_empty.remove(tag)
+            return
+        self._flush()
+        # Close the most recent open tag with this name, and everything opened inside it
+        if self.open_counts.get(tag):
+            while self.stack:
+                name = self.stack[-1][0]
+                self._pop()
+                if name == tag:
+                    break
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_charref(self, name):
+        base = 16 if name[:1] in ("x", "X") else 10
+        digits = name[1:] if base == 16 else name
+        end = 0
+        valid = "0123456789abcdefABCDEF" if base == 16 else "0123456789"
+        while end < len(digits) and digits[end] in valid:
+            end += 1
+        if end == 0:
+            self.handle_data(name)
+            return
+        self.handle_data(unescape(f"&#{'x' if base == 16 else ''}{digits[:end]};"))
+        self.handle_data(digits[end:])
+
+    def handle_entityref(self, name):
+        character = html5.get(name + ";")
+        self.handle_data(character if character is not None else "&" + name)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self.pending.append(data[len("CDATA["):])
+            self._flush()
+
+    def close(self):
+        HTMLParser.close(self)
+        self._flush()
+        while self.stack:
+            self._pop()
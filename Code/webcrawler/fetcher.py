@@ -0,0 +1,172 @@
+import requests as req
+import threading
+from urllib.parse import urljoin, urlparse
+
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+MAX_DOMAIN_VISITS = 1000
+LOCK_SHARDS = 64 # Locks the per-domain visit counts are split over
+
+class Fetcher:
+    def __init__(self, session, body_reader, parse, stats, on_domain_capped=None, single_request=True):
+        self.session = session # Pooled keep-alive connections shared by all threads
+        self.body_reader = body_reader # Size and time capped body downloads
+        self.parse = parse # Called with (content, url, charset) to turn a body into (outlinks, text, title)
+        self.stats = stats
+        self.on_domain_capped = on_domain_capped # Called once with a domain when its visit cap is reached
+        self.single_request = single_request # Fetch pages with one GET instead of a HEAD probe followed by a GET
+        self.domain_visits = {} # Keep track of number of visits made to each domain
+        self.skipped_domains = set()
+        # Each domain's count is guarded by one of several locks, picked by
+        # hashing the domain, so threads on different domains rarely contend
+        self.locks = [threading.Lock() for _ in range(LOCK_SHARDS)]
+
+    '''
+    Fetches and parses a page. Returns (outlinks, text, title), or None if
+    the page is not crawlable
+    '''
+    def fetch(self, url):
+        if self.single_request:
+            return self.fetch_page(url)
+        valid_page, site_url = self.valid_page(url)
+        return self.read_contents(site_url) if valid_page else None
+
+    '''
+    Fetches and parses a page with a single streamed GET. The content type and
+    language are checked from the response headers, and the body is only
+    downloaded for english HTML pages. Redirects are followed up to
+    MAX_REDIRECTS hops, and a redirect back to an earlier url ends the fetch.
+    Returns (outlinks, text, title), or None if the page is not crawlable
+    '''
+    def fetch_page(self, url):
+        chain = set()
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                chain.add(url)
+                domain = urlparse(url).netloc.lower()
+                if not self.domain_allowed(domain):
+                    return None
+
+                with self.session.get(url, stream=True, allow_redirects=False) as res:
+                    if res.status_code in REDIRECT_CODES:
+                        # If redirected, check the new location
+                        new_url = res.headers.get('Location')
+                        if not new_url:
+                            return None # If no new location is provided, consider it invalid
+                        url = urljoin(url, new_url)
+                        if url in chain:
+                            self.stats.incr("redirect_loops")
+                            return None
+                        continue
+                    if res.status_code != 200 or not is_english_html(res.headers):
+                        return None # Closing the response drops the unread body
+
+                    content, charset = self.body_reader.read(res)
+                    if content is None:
+                        return None
+                    self.record_visit(domain)
+                return self.parse(content, url, charset)
+
+            self.stats.incr("redirect_limit_reached")
+            return None
+
+        except req.exceptions.Timeout as t:
+            return None
+        except req.exceptions.RequestException as re:
+            return None
+        except Exception as e:
+            return None
+
+    '''
+    Checks if a page is of the appropriate type for crawling
+    '''
+    def valid_page(self, url, redirects=0):
+        try:
+            parsed_url = urlparse(url)
+            domain = parsed_url.netloc.lower()
+            if not self.domain_allowed(domain):
+                return False, None
+
+            res = self.session.head(url)
+            if res.status_code == 200:
+                if is_english_html(res.headers):
+                    self.record_visit(domain)
+                    return True, url
+                else:
+                    return False, None
+            elif res.status_code in REDIRECT_CODES:
+                # If redirected, check the new location
+                new_url = res.headers.get('Location')
+                if new_url and redirects < MAX_REDIRECTS:
+                    return self.valid_page(urljoin(url, new_url), redirects + 1)  # Recursively check the new URL
+                else:
+                    return False, None  # If no new location is provided, consider it invalid
+            else:
+                return False, None
+
+        except req.exceptions.Timeout as t:
+            return False, None
+        except req.exceptions.RequestException as re:
+            return False, None
+        except Exception as e:
+            return False, None
+
+    '''
+    Function that downloads an HTML page and parses its text and outlinks
+    '''
+    def read_contents(self, url):
+        try:
+            with self.session.get(url, stream=True) as res:
+                res.raise_for_status()
+                content, charset = self.body_reader.read(res)
+            if content is None:
+                return set(), "", ""
+            return self.parse(content, url, charset)
+
+        except req.exceptions.Timeout as t:
+            return set(), "", ""
+        except req.exceptions.RequestException as e:
+            return set(), "", ""
+        except Exception as e:
+            return set(), "", ""
+
+    '''
+    Checks if the visit cap for a domain has not been reached. The first time
+    a domain hits the cap, on_domain_capped is called so its queued urls can
+    be dropped
+    '''
+    def domain_allowed(self, domain):
+        with self._lock(domain):
+            if domain in self.skipped_domains:
+                return False
+            if self.domain_visits.setdefault(domain, 1) < MAX_DOMAIN_VISITS:
+                return True
+            self.skipped_domains.add(domain)
+        if self.on_domain_capped is not None:
+            self.on_domain_capped(domain)
+        return False
+
+    '''
+    Counts a successful visit to a domain
+    '''
+    def record_visit(self, domain):
+        with self._lock(domain):
+            self.domain_visits[domain] = self.domain_visits.get(domain, 1) + 1
+
+    '''
+    Returns (domain, visits, skipped) for every visited domain
+    '''
+    def domain_counts(self):
+        visits = list(self.domain_visits.items()) # Copied in one step, so it is consistent without a lock
+        return [(domain, count, domain in self.skipped_domains) for domain, count in visits]
+
+    def _lock(self, domain):
+        return self.locks[hash(domain) % LOCK_SHARDS]
+
+'''
+Checks response headers for an english HTML page
+'''
+def is_english_html(headers):
+    cont_type = headers.get("content-type", "")
+    cont_lang = headers.get("content-language", "")
+    return 'text/html' in cont_type and "en" in cont_lang.lower()
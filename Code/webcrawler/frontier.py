@@ -0,0 +1,444 @@
+from .coldstore import ColdStore
+import numpy as np
+from .scoring import DEFAULT_WEIGHTS, MIN_BATCH, TRUSTED_SUFFIXES, ScoreTable, score
+from .termmatch import compile_terms
+import threading
+from urllib.parse import urlparse
+from .urlseen import URLSeenSet
+
+# Items are only modified under the Frontier's lock, so they carry no lock of
+# their own. Slots keep the per-item memory down, as a crawl discovers far more
+# urls than it crawls
+class FrontierItem:
+    __slots__ = ("url", "anchor", "trusted", "inlinks_set", "outlinks_set", "title", "pageText",
+                 "wavenum", "term_matches", "inlink_count", "trusted_inlink_count", "priority", "row")
+
+    def __init__(self, url, inlink="", wavenum=1, anchor="", related_terms=[], term_matches=None, weights=DEFAULT_WEIGHTS):
+        self.url = url
+        self.anchor = anchor
+
+        parsed_url = urlparse(self.url)
+        domain = parsed_url.netloc.lower()
+        if (".edu" in domain) or (".gov" in domain) or (".org" in domain):
+            self.trusted = True
+        else:
+            self.trusted = False
+
+        self.inlinks_set = set()  # Track in-links
+        self.outlinks_set = set()  # Track out-links
+        self.title = ""
+        self.pageText = ""
+        self.wavenum = wavenum
+
+        # The url and anchor never change, so their related term matches are
+        # counted once. The Frontier passes in the count from its matcher, or
+        # from disk when the item is rebuilt. Inlink counts are kept by add_inlink
+        if term_matches is None:
+            term_matches = compile_terms(tuple(related_terms)).count(url, anchor)
+        self.term_matches = term_matches
+        self.inlink_count = 0
+        self.trusted_inlink_count = 0
+        self.row = None # Row of the item's features in the Frontier's ScoreTable, while it is queued in memory
+        self.rescore(weights)
+        if inlink != "":
+            self.add_inlink(inlink, weights)
+
+    # Comparison to prioritize higher score items
+    def __lt__(self, other):
+        return self.priority > other.priority
+
+    # Adds an inlink to the frontier item, updating the cached priority
+    def add_inlink(self, link, weights=DEFAULT_WEIGHTS):
+        if self.count_inlink(link) is not None:
+            self.rescore(weights)
+
+    # Records an inlink without rescoring. Returns whether the link is
+    # trusted, or None if it was already recorded
+    def count_inlink(self, link):
+        if link in self.inlinks_set:
+            return None
+        self.inlinks_set.add(link)
+        self.inlink_count += 1
+        trusted = link.endswith(TRUSTED_SUFFIXES)
+        self.trusted_inlink_count += trusted
+        return trusted
+
+    # Recomputes the cached priority from the item's features
+    def rescore(self, weights=DEFAULT_WEIGHTS):
+        self.priority = score(weights, self.term_matches, self.wavenum, self.trusted, self.inlink_count, self.trusted_inlink_count)
+
+    # Updates frontier item with crawled outgoing links, text, and title
+    def process_URL(self, outgoings, text, title):
+        self.outlinks_set = outgoings
+        self.pageText = text
+        self.title = title
+
+    # Defines score of a frontier item, used to determine ordering in priority queue
+    def score(self):
+        return self.priority
+
+
+# Binary heap of FrontierItems with a position map from url to heap index.
+# The map lets a single item be re-sifted in O(log n) when its priority
+# changes, so the queue order always matches the current scores
+class PriorityQueue:
+    def __init__(self):
+        self.heap = []
+        self.position = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, url):
+        return url in self.position
+
+    # Adds an item to the queue
+    def push(self, item):
+        self.heap.append(item)
+        self.position[item.url] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    # Adds many items at once, rebuilding heap order in O(n)
+    def extend(self, items):
+        heap = self.heap
+        for item in items:
+            heap.append(item)
+            self.position[item.url] = len(heap) - 1
+        for index in reversed(range(len(heap) // 2)):
+            self._sift_down(index)
+
+    # Replaces the queued items with items sorted by descending priority,
+    # which are already in heap order
+    def load_sorted(self, items):
+        self.heap = items
+        self.position = {item.url: index for index, item in enumerate(items)}
+
+    # Removes and returns the highest priority item
+    def pop(self):
+        head = self.heap[0]
+        self._remove_at(0)
+        return head
+
+    # Restores heap order after the priority of a queued item changed
+    def update(self, item):
+        index = self.position.get(item.url)
+        if index is not None:
+            self._sift_up(index)
+            self._sift_down(self.position[item.url])
+
+    # Removes the item with the given url, if it is queued
+    def remove(self, url):
+        index = self.position.get(url)
+        if index is not None:
+            self._remove_at(index)
+
+    def _remove_at(self, index):
+        removed = self.heap[index]
+        del self.position[removed.url]
+        last = self.heap.pop()
+        if last is not removed:
+            self.heap[index] = last
+            self.position[last.url] = index
+            self._sift_up(index)
+            self._sift_down(self.position[last.url])
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i].url] = i
+        self.position[heap[j].url] = j
+
+    def _sift_up(self, index):
+        heap = self.heap
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[index] < heap[parent]:
+                self._swap(index, parent)
+                index = parent
+            else:
+                break
+
+    def _sift_down(self, index):
+        heap = self.heap
+        size = len(heap)
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if heap[child] < heap[index]:
+                self._swap(index, child)
+                index = child
+            else:
+                break
+
+
+# Queued urls are held in two tiers. The hot tier is the in-memory priority
+# queue. Once it holds more than hot_capacity items, its lower priority half is
+# spilled to a ColdStore on disk, and whenever the best spilled url outranks the
+# head of the hot queue, a batch of the best spilled urls is merged back in.
+# With hot_capacity None, every queued url stays in memory. The scoring
+# features of the hot tier are also kept in a ScoreTable, so inlinks from a
+# crawled page and new weights are rescored in vectorized batches
+class Frontier:
+    def __init__(self, related_terms, hot_capacity=None, spill_dir=None, weights=None):
+        self.url_map = {}
+        self.queue = PriorityQueue()
+        self.related_terms = related_terms
+        self.matcher = compile_terms(tuple(related_terms)) # Counts the related terms in a url and its anchor text
+        self.visited_pages = URLSeenSet()
+        self.removed_urls = URLSeenSet()
+        self.excluded_domains = set()
+        self.journal = None # Changes since the last checkpoint, recorded once a Checkpoint is attached
+        self.hot_capacity = hot_capacity # Most queued items kept in memory
+        self.spill_dir = spill_dir # Directory for the cold tier file, the system temp directory if None
+        self.cold = None # ColdStore created on the first spill
+        self.router = None # Router that sends outlinks owned by other partitions to them, in a partitioned crawl
+        self.weights = dict(weights or DEFAULT_WEIGHTS) # Scoring weights, see scoring.DEFAULT_WEIGHTS
+        self.scores = ScoreTable(self.weights) # Features of the items in the hot queue, by FrontierItem.row
+        self.lock = threading.Lock()
+
+    # Processes the crawler response by updating the last crawled 
+    # frontier item, then adding the outlinks in one add_urls batch,
+    # or sending them to the partition that owns them.
+    # With keep_contents False, the item only records that the page was
+    # crawled, for when the contents have already been written out. With
+    # expand False, the outlinks are not followed
+    def processResponse(self, url, outgoings, text, title, keep_contents=True, expand=True):
+        with self.lock:
+            item = self.url_map[url]
+            if keep_contents:
+                item.process_URL(outgoings, text, title)
+            previous_wave = item.wavenum
+            self.url_map[url] = item
+            if self.journal is not None:
+                # Contents that were written out are not journaled a second time
+                self.journal.append(("crawl", url, outgoings, text if keep_contents else None, title if keep_contents else None))
+        if not expand:
+            return
+
+        links = []
+        for link, anchor in outgoings:
+            if self.router is None or self.router.owns(link):
+                links.append((link, url, previous_wave+1, anchor))
+            else:
+                self.router.send(link, url, previous_wave+1, anchor)
+        self.add_urls(links)
+
+    # Adds a given url to the frontier. If the url already exists 
+    # in the frontier, updates its inlink count and, if it is still 
+    # queued, moves it to its new position in the priority queue
+    def add_url(self, url, in_link="", wavenum=0, anchor_text=""):
+        self.add_urls([(url, in_link, wavenum, anchor_text)])
+
+    # Adds (url, in_link, wavenum, anchor_text) tuples as add_url does. The
+    # queued items that gain inlinks are rescored together once all are added
+    def add_urls(self, links):
+        with self.lock:
+            updated = []
+            rows = []
+            trusted = []
+            for url, in_link, wavenum, anchor_text in links:
+                if url in self.removed_urls:
+                    continue
+                parsed_url = urlparse(url)
+                domain = parsed_url.netloc.lower()
+                if domain in self.excluded_domains:
+                    continue
+                item = self.url_map.get(url)
+                if item is None and (self.cold is None or url not in self.cold):
+                    item = FrontierItem(url, in_link, wavenum, anchor_text, term_matches=self.matcher.count(url, anchor_text),
+                                        weights=self.weights)
+                    self.url_map[url] = item
+                    self._push(item)
+                    if self.journal is not None:
+                        self.journal.append(("add", url, in_link, wavenum, anchor_text))
+                    continue
+                if item is None:
+                    # Spilled to disk, so update its stored priority
+                    self.cold.add_inlink(url, in_link, self.weights)
+                elif item.row is None:
+                    # Already crawled, so only the inlink is recorded
+                    item.add_inlink(in_link, self.weights)
+                else:
+                    is_trusted = item.count_inlink(in_link)
+                    if is_trusted is not None:
+                        updated.append(item)
+                        rows.append(item.row)
+                        trusted.append(is_trusted)
+                if self.journal is not None:
+                    self.journal.append(("inlink", url, in_link))
+            if updated:
+                self.scores.add_inlinks(rows, trusted)
+                self._rescore(list(dict.fromkeys(updated)))
+            self._spill()
+
+    # Removes a url from the Frontier. Used by the Crawler 
+    # to remove urls that are not going to crawled
+    def remove_url(self, url):
+        with self.lock:
+            item = self.url_map.pop(url, None)
+            if item is None:
+                if self.cold is None or not self.cold.remove(url):
+                    return
+            elif item.row is not None:
+                self.queue.remove(url)
+                self._release(item)
+            self.removed_urls.add(url)
+            if self.journal is not None:
+                self.journal.append(("remove", url))
+    
+    # Removes a domain from the Frontier. Used by the Crawler 
+    # to list domains that are not going to crawled due to having
+    # reached the cap for number of visits
+    def remove_domain(self, domain):
+        with self.lock:
+            self.excluded_domains.add(domain)
+            if self.journal is not None:
+                self.journal.append(("exclude", domain))
+
+    # Replaces the scoring weights and rescores every queued url: the hot
+    # tier in one vectorized pass over the score table, the cold tier in one
+    # UPDATE. The hot queue is then rebuilt in the new order
+    def set_weights(self, weights):
+        with self.lock:
+            self.weights = dict(weights)
+            self.scores.weights = self.weights
+            items = self.queue.heap
+            priorities = self.scores.rescore(np.fromiter((item.row for item in items), np.intp, len(items)))
+            for item, priority in zip(items, priorities.tolist()):
+                item.priority = priority
+            self.queue.load_sorted([items[i] for i in np.argsort(-priorities, kind="stable").tolist()])
+            if self.cold is not None:
+                self.cold.set_weights(self.weights)
+
+    # Returns the changes recorded since the last call and starts a new journal
+    def take_journal(self):
+        with self.lock:
+            journal, self.journal = self.journal, []
+            return journal
+
+    # Replaces the frontier state with items loaded from a checkpoint. items
+    # holds (FrontierItem, crawled) pairs; uncrawled items are queued again
+    # and rescored with the frontier's weights
+    def restore(self, items, removed_urls, excluded_domains):
+        with self.lock:
+            self.url_map = {}
+            self.queue = PriorityQueue()
+            self.scores = ScoreTable(self.weights)
+            self.visited_pages = URLSeenSet()
+            self.removed_urls = URLSeenSet()
+            queued = []
+            for item, crawled in items:
+                self.url_map[item.url] = item
+                if crawled:
+                    self.visited_pages.add(item.url)
+                else:
+                    queued.append(item)
+            self._push_many(queued)
+            for url in removed_urls:
+                self.removed_urls.add(url)
+            self.excluded_domains = set(excluded_domains)
+            if self.cold is not None:
+                self.cold.close()
+                self.cold = None
+            self._spill()
+
+    # Pops head of queue and returns the url to the Crawler
+    def get_next_url(self):
+        with self.lock:
+            if self.cold and (not self.queue or self.cold.best_priority() > self.queue.heap[0].priority):
+                self._unspill()
+            if self.queue:
+                item = self.queue.pop()
+                self._release(item)
+                self.visited_pages.add(item.url)
+                return item.url
+            else:
+                return None
+
+    # Puts urls taken with get_next_url back in the queue, scored with any
+    # inlinks they gained in the meantime. Urls removed since are skipped
+    def requeue(self, urls):
+        with self.lock:
+            items = [item for item in map(self.url_map.get, urls) if item is not None and item.row is None]
+            self._push_many(items)
+            self._spill()
+
+    # Queues a new item, giving it a row in the score table
+    def _push(self, item):
+        item.row = self.scores.add(item.term_matches, item.wavenum, item.trusted, item.inlink_count, item.trusted_inlink_count)
+        self.queue.push(item)
+
+    # Queues many items, scoring them in one pass over the score table
+    def _push_many(self, items):
+        for item in items:
+            item.row = self.scores.add(item.term_matches, item.wavenum, item.trusted, item.inlink_count, item.trusted_inlink_count)
+        self._rescore(items, update=False)
+        self.queue.extend(items)
+
+    # Sets the priority of items from their rows in the score table, moving
+    # each to its new queue position if update is set. The heap is only
+    # repaired one changed item at a time, so each is moved as soon as its
+    # priority is set. Small batches are scored one item at a time, which
+    # gives the same priorities
+    def _rescore(self, items, update=True):
+        if len(items) < MIN_BATCH:
+            priorities = [score(self.weights, item.term_matches, item.wavenum, item.trusted, item.inlink_count,
+                                item.trusted_inlink_count) for item in items]
+        else:
+            priorities = self.scores.rescore(np.fromiter((item.row for item in items), np.intp, len(items))).tolist()
+        for item, priority in zip(items, priorities):
+            item.priority = priority
+            if update:
+                self.queue.update(item)
+
+    # Frees the score table row of an item leaving the hot queue
+    def _release(self, item):
+        self.scores.remove(item.row)
+        item.row = None
+
+    # Moves the lower priority half of the hot queue to disk once it is over capacity
+    def _spill(self):
+        if self.hot_capacity is None or len(self.queue) <= self.hot_capacity:
+            return
+        if self.cold is None:
+            self.cold = ColdStore(self.spill_dir)
+        items = sorted(self.queue.heap, key=lambda item: -item.priority)
+        keep = self.hot_capacity // 2
+        self.queue = PriorityQueue()
+        self.queue.extend(items[:keep])
+        spilled = items[keep:]
+        self.cold.put_many(spilled)
+        for item in spilled:
+            self._release(item)
+            del self.url_map[item.url]
+
+    # Merges a batch of the best spilled urls back into the hot queue
+    def _unspill(self):
+        items = []
+        for url, wavenum, anchor, term_matches, inlinks, trusted_inlinks, links in self.cold.take(max(1, self.hot_capacity // 4)):
+            item = FrontierItem(url, "", wavenum, anchor, term_matches=term_matches, weights=self.weights)
+            item.inlinks_set.update(links)
+            item.inlink_count = inlinks
+            item.trusted_inlink_count = trusted_inlinks
+            self.url_map[url] = item
+            items.append(item)
+        self._push_many(items)
+
+    # Deletes the cold tier file
+    def close(self):
+        with self.lock:
+            if self.cold is not None:
+                self.cold.close()
+                self.cold = None
+
+    # Returns the subset of pages that were crawled. 
+    # Used by Crawler as the return value of the crawl method
+    def get_crawled_pages(self):
+        non_empty_pages = {}
+        for url, item in self.url_map.items():
+            if item.pageText != "":
+                non_empty_pages[url] = item
+        return non_empty_pages
\ No newline at end of file
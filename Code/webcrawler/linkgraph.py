@@ -0,0 +1,261 @@
+from array import array
+import json
+import mmap
+import os
+from .urlseen import FingerprintMap, url_fingerprint
+
+URLS = "urls.txt" # Newline-terminated urls in id order, the string table
+EDGES_LOG = "edges.log" # (source, target) id pairs as they were crawled
+CRAWLED_LOG = "crawled.log" # Ids of crawled pages
+URL_OFFSETS = "url_offsets.bin"
+OUT_OFFSETS = "out_offsets.bin"
+OUT_TARGETS = "out_targets.bin"
+IN_OFFSETS = "in_offsets.bin"
+IN_TARGETS = "in_targets.bin"
+CRAWLED = "crawled.bin"
+META = "meta.json"
+
+# Writes the link graph of a crawl. Urls are interned to integer ids as they
+# are seen, new urls are appended to the string table and edges to a log of id
+# pairs, so memory holds only the url to id map. close() builds the CSR files
+# that LinkGraph opens. With resume, the logs of an earlier run are extended
+class LinkGraphWriter:
+    def __init__(self, directory, resume=False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ids = FingerprintMap()
+        self.num_urls = 0
+        if resume:
+            self._load_urls()
+        mode = 'ab' if resume else 'wb'
+        self.urls = open(self._path(URLS), mode, buffering=1 << 20)
+        self.edges = open(self._path(EDGES_LOG), mode)
+        self.crawled = open(self._path(CRAWLED_LOG), mode)
+        self.pending_edges = array('I')
+        self.pending_crawled = array('I')
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # Rebuilds the url ids from the string table, dropping a partly written last url
+    def _load_urls(self):
+        path = self._path(URLS)
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as file:
+            data = file.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            with open(path, 'r+b') as file:
+                file.truncate(end)
+        for url in data[:end].split(b'\n')[:-1]:
+            self.ids.setdefault(url_fingerprint(url.decode('utf-8')), self.num_urls)
+            self.num_urls += 1
+
+    # Returns the id of a url, adding it to the string table if it is new
+    def intern(self, url):
+        node = self.ids.setdefault(url_fingerprint(url), self.num_urls)
+        if node == self.num_urls:
+            self.urls.write(url.encode('utf-8') + b'\n')
+            self.num_urls += 1
+        return node
+
+    # Records a crawled page and the urls it links to
+    def add_page(self, url, links):
+        source = self.intern(url)
+        self.pending_crawled.append(source)
+        pending = self.pending_edges
+        for link in links:
+            pending.append(source)
+            pending.append(self.intern(link))
+        if len(pending) >= 1 << 16:
+            self._write_pending()
+
+    def _write_pending(self):
+        # The string table goes first, so logged edges never point past it
+        self.urls.flush()
+        self.pending_edges.tofile(self.edges)
+        self.pending_crawled.tofile(self.crawled)
+        self.pending_edges = array('I')
+        self.pending_crawled = array('I')
+
+    # Appends the logs of another graph directory, such as the graph of one
+    # partition of a crawl, translating its url ids to the ids of this graph
+    def merge(self, directory):
+        path = lambda name: os.path.join(directory, name)
+        ids = array('I')
+        if os.path.exists(path(URLS)):
+            with open(path(URLS), 'rb') as file:
+                data = file.read()
+            for url in data[:data.rfind(b'\n') + 1].split(b'\n')[:-1]:
+                ids.append(self.intern(url.decode('utf-8')))
+        edges = _read_ids(path(EDGES_LOG))
+        for i in range(0, len(edges) - 1, 2):
+            source, target = edges[i], edges[i + 1]
+            if source < len(ids) and target < len(ids):
+                self.pending_edges.append(ids[source])
+                self.pending_edges.append(ids[target])
+        self.pending_crawled.extend(ids[node] for node in _read_ids(path(CRAWLED_LOG)) if node < len(ids))
+        self._write_pending()
+
+    # Pushes everything recorded so far to disk
+    def sync(self):
+        self._write_pending()
+        for file in (self.urls, self.edges, self.crawled):
+            file.flush()
+            os.fsync(file.fileno())
+
+    # Closes the logs and builds the CSR files
+    def close(self, fsync=False):
+        if fsync:
+            self.sync()
+        else:
+            self._write_pending()
+        for file in (self.urls, self.edges, self.crawled):
+            file.close()
+        build_graph(self.directory)
+
+# Builds CSR adjacency from the logs in a graph directory. Duplicate edges are
+# dropped, and each node's targets are sorted. Offsets are 64-bit and ids
+# 32-bit, in native byte order
+def build_graph(directory):
+    path = lambda name: os.path.join(directory, name)
+    with open(path(URLS), 'rb') as file:
+        data = file.read()
+    url_offsets = array('Q', [0])
+    start = data.find(b'\n')
+    while start != -1:
+        url_offsets.append(start + 1)
+        start = data.find(b'\n', start + 1)
+    num_nodes = len(url_offsets) - 1
+
+    edges = _read_ids(path(EDGES_LOG))
+    pairs = set()
+    for i in range(0, len(edges) - 1, 2):
+        source, target = edges[i], edges[i + 1]
+        if source < num_nodes and target < num_nodes:
+            pairs.add(source << 32 | target)
+    out_keys = sorted(pairs)
+    in_keys = sorted((key & 0xFFFFFFFF) << 32 | key >> 32 for key in out_keys)
+
+    crawled = bytearray(num_nodes)
+    for node in _read_ids(path(CRAWLED_LOG)):
+        if node < num_nodes:
+            crawled[node] = 1
+
+    out_offsets, out_targets = _csr(out_keys, num_nodes)
+    in_offsets, in_targets = _csr(in_keys, num_nodes)
+    for name, values in ((URL_OFFSETS, url_offsets), (OUT_OFFSETS, out_offsets), (OUT_TARGETS, out_targets),
+                         (IN_OFFSETS, in_offsets), (IN_TARGETS, in_targets), (CRAWLED, crawled)):
+        _replace(path(name), values)
+    _replace(path(META), json.dumps({"num_nodes": num_nodes, "num_edges": len(out_keys)}).encode('utf-8'))
+
+# Reads a log of 32-bit ids, ignoring a partly written last id
+def _read_ids(path):
+    ids = array('I')
+    if os.path.exists(path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        ids.frombytes(data[:len(data) - len(data) % ids.itemsize])
+    return ids
+
+# Turns sorted (row << 32 | column) keys into offsets and columns
+def _csr(keys, num_nodes):
+    offsets = array('Q', bytes(8 * (num_nodes + 1)))
+    for key in keys:
+        offsets[(key >> 32) + 1] += 1
+    for node in range(num_nodes):
+        offsets[node + 1] += offsets[node]
+    return offsets, array('I', [key & 0xFFFFFFFF for key in keys])
+
+def _replace(path, data):
+    with open(path + ".tmp", 'wb') as file:
+        file.write(data)
+    os.replace(path + ".tmp", path)
+
+# Read-only view of a link graph built by LinkGraphWriter. Every array is a
+# memoryview over a memory-mapped file, so opening the graph reads nothing
+# up front. out_offsets/out_targets and in_offsets/in_targets are CSR
+# adjacency: the out-links of node n are out_targets[out_offsets[n]:out_offsets[n + 1]].
+# For PageRank or HITS, numpy.frombuffer wraps the arrays without copying
+class LinkGraph:
+    def __init__(self, directory):
+        self.directory = directory
+        self.maps = []
+        with open(os.path.join(directory, META)) as file:
+            meta = json.load(file)
+        self.num_nodes = meta["num_nodes"]
+        self.num_edges = meta["num_edges"]
+        self.url_data = self._map(URLS, 'B')
+        self.url_offsets = self._map(URL_OFFSETS, 'Q')
+        self.out_offsets = self._map(OUT_OFFSETS, 'Q')
+        self.out_targets = self._map(OUT_TARGETS, 'I')
+        self.in_offsets = self._map(IN_OFFSETS, 'Q')
+        self.in_targets = self._map(IN_TARGETS, 'I')
+        self.crawled = self._map(CRAWLED, 'B')
+        self.ids = None # Url to id map, built on the first id() call
+
+    def _map(self, name, typecode):
+        with open(os.path.join(self.directory, name), 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return memoryview(array(typecode))
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.num_nodes
+
+    # Returns the url of a node
+    def url(self, node):
+        return bytes(self.url_data[self.url_offsets[node]:self.url_offsets[node + 1] - 1]).decode('utf-8')
+
+    # Returns the node of a url, or None if it is not in the graph
+    def id(self, url):
+        if self.ids is None:
+            self.ids = FingerprintMap(2 * self.num_nodes)
+            for node in range(self.num_nodes):
+                self.ids.setdefault(url_fingerprint(self.url(node)), node)
+        return self.ids.get(url_fingerprint(url))
+
+    def is_crawled(self, node):
+        return self.crawled[node] == 1
+
+    # Nodes the passed node links to
+    def out_links(self, node):
+        return self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]]
+
+    # Nodes that link to the passed node
+    def in_links(self, node):
+        return self.in_targets[self.in_offsets[node]:self.in_offsets[node + 1]]
+
+    def out_degree(self, node):
+        return self.out_offsets[node + 1] - self.out_offsets[node]
+
+    def in_degree(self, node):
+        return self.in_offsets[node + 1] - self.in_offsets[node]
+
+    # Returns the (inlinks, outlinks) urls of a url, the form the indexer
+    # stores. With crawled_only, links to pages that were not crawled are left out
+    def links(self, url, crawled_only=True):
+        node = self.id(url)
+        if node is None:
+            return [], []
+        keep = lambda other: not crawled_only or self.crawled[other] == 1
+        return ([self.url(other) for other in self.in_links(node) if keep(other)],
+                [self.url(other) for other in self.out_links(node) if keep(other)])
+
+    # Releases the mapped files. Slices returned by out_links and
+    # in_links must not be used afterwards
+    def close(self):
+        for name in ("url_data", "url_offsets", "out_offsets", "out_targets", "in_offsets", "in_targets", "crawled"):
+            getattr(self, name).release()
+        for mapped in self.maps:
+            mapped.close()
+        self.maps = []
@@ -0,0 +1,90 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from .extractors import get_extractor
+import os
+import threading
+
+extractor = None # Extractor of each pool process, set by _init_process
+
+def _init_process(extractor_name):
+    global extractor
+    extractor = get_extractor(extractor_name)
+
+# Parses a batch of (content, url, encoding) pages in a pool process. Outlinks
+# are returned as tuples rather than sets to keep the pickled results small
+def _parse_batch(batch):
+    results = []
+    for content, url, encoding in batch:
+        try:
+            outlinks, text_data, title = extractor.extract(content, url, encoding)
+            results.append((tuple(outlinks), text_data, title))
+        except Exception:
+            results.append(((), "", ""))
+    return results
+
+# Parsing stage that runs extractors in a ProcessPoolExecutor, so HTML parsing
+# is not bound by the GIL shared with the fetcher threads. Pages are sent to
+# the pool in batches of batch_size, or after batch_delay seconds if a batch
+# does not fill. At most max_pending pages may be waiting on the pool; past
+# that, submit blocks the fetcher until the parsers catch up
+class ParsePool:
+    def __init__(self, extractor="streaming", processes=None, batch_size=8, batch_delay=0.05, max_pending=None):
+        self.processes = processes or os.cpu_count()
+        self.executor = ProcessPoolExecutor(self.processes, initializer=_init_process, initargs=(extractor,))
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.slots = threading.BoundedSemaphore(max_pending or 4 * self.processes * batch_size)
+        self.batch = []
+        self.futures = []
+        self.timer = None
+        self.lock = threading.Lock()
+
+    # Queues a page for parsing and returns a Future of (outlinks, text, title)
+    def submit(self, content, url, encoding=None):
+        self.slots.acquire()
+        future = Future()
+        with self.lock:
+            self.batch.append((content, url, encoding))
+            self.futures.append(future)
+            if len(self.batch) >= self.batch_size:
+                self._send_batch()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.batch_delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return future
+
+    # Parses a page, blocking until its result is ready
+    def parse(self, content, url, encoding=None):
+        return self.submit(content, url, encoding).result()
+
+    # Sends any partially filled batch to the pool
+    def flush(self):
+        with self.lock:
+            if self.batch:
+                self._send_batch()
+
+    def _send_batch(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, futures = self.batch, self.futures
+        self.batch, self.futures = [], []
+        task = self.executor.submit(_parse_batch, batch)
+        task.add_done_callback(lambda task: self._deliver(task, futures))
+
+    def _deliver(self, task, futures):
+        try:
+            results = task.result()
+        except Exception as e:
+            results = [e] * len(futures)
+        for future, result in zip(futures, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                outlinks, text_data, title = result
+                future.set_result((set(outlinks), text_data, title))
+            self.slots.release()
+
+    def shutdown(self):
+        self.flush()
+        self.executor.shutdown()
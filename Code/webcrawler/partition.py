@@ -0,0 +1,366 @@
+from .backends import get_backend
+from .dedupe import add_rates
+from .linkgraph import LinkGraphWriter
+import multiprocessing
+from multiprocessing.connection import Client, Listener
+import os
+import shutil
+from .sink import CHUNK_FILE, DocumentSink, next_chunk_number
+import threading
+from time import sleep, time
+from .trec import results_files
+from urllib.parse import urlparse
+from zlib import crc32
+
+# Returns the partition that owns the host of a url. Stable across processes
+# and machines, unlike hash()
+def partition_of(url, num_partitions):
+    return crc32(urlparse(url).netloc.lower().encode('utf-8')) % num_partitions
+
+# Sends outlinks on hosts owned by other partitions to those partitions, and
+# receives the ones they send here. Links are buffered per partition and sent
+# as a batch of (url, in_link, wavenum, anchor) tuples once batch_size are
+# waiting, or on flush(). Connections are multiprocessing.connection
+# Client/Listener pairs, which run over TCP, so partitions may be spread over
+# several machines. Received batches are passed to deliver. sent counts links
+# as they are buffered and received as they are delivered, so while any link
+# is on its way the totals over all partitions differ. A partition that
+# cannot be reached within connect_timeout is given up on, and later sends
+# to it fail at once
+class Router:
+    def __init__(self, index, addresses, authkey, deliver, batch_size=200, connect_timeout=30):
+        self.index = index
+        self.addresses = addresses # Listening address of every partition, by index
+        self.authkey = authkey
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.connect_timeout = connect_timeout
+        self.buffers = [[] for _ in addresses]
+        self.connections = [None] * len(addresses)
+        self.unreachable = [None] * len(addresses) # The error connecting to each partition that could not be reached
+        self.send_locks = [threading.Lock() for _ in addresses]
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.received = 0
+        self.listener = Listener(addresses[index], authkey=authkey)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def owns(self, url):
+        return partition_of(url, len(self.addresses)) == self.index
+
+    # Queues a link for the partition that owns it
+    def send(self, url, in_link, wavenum, anchor):
+        partition = partition_of(url, len(self.addresses))
+        with self.lock:
+            self.sent += 1
+            buffer = self.buffers[partition]
+            buffer.append((url, in_link, wavenum, anchor))
+            if len(buffer) < self.batch_size:
+                return
+            self.buffers[partition] = []
+        self._send_batch(partition, buffer)
+
+    # Sends every buffered link
+    def flush(self):
+        for partition in range(len(self.addresses)):
+            with self.lock:
+                batch, self.buffers[partition] = self.buffers[partition], []
+            if batch:
+                self._send_batch(partition, batch)
+
+    # Returns (sent, received, whether links are still buffered)
+    def counts(self):
+        with self.lock:
+            return self.sent, self.received, any(self.buffers)
+
+    def close(self):
+        self.listener.close()
+        for connection in self.connections:
+            if connection is not None:
+                connection.close()
+
+    def _send_batch(self, partition, batch):
+        with self.send_locks[partition]:
+            if self.unreachable[partition] is not None:
+                raise self.unreachable[partition]
+            if self.connections[partition] is None:
+                try:
+                    self.connections[partition] = self._connect(self.addresses[partition])
+                except OSError as e:
+                    self.unreachable[partition] = e
+                    raise
+            self.connections[partition].send(batch)
+
+    # Connects to a partition, retrying while it is still starting up
+    def _connect(self, address):
+        deadline = time() + self.connect_timeout
+        while True:
+            try:
+                return Client(address, authkey=self.authkey)
+            except ConnectionRefusedError:
+                if time() > deadline:
+                    raise
+                sleep(0.1)
+
+    def _accept(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                return # Listener closed
+            threading.Thread(target=self._receive, args=(connection,), daemon=True).start()
+
+    def _receive(self, connection):
+        while True:
+            try:
+                batch = connection.recv()
+            except (EOFError, OSError):
+                return
+            self.deliver(batch)
+            with self.lock:
+                self.received += len(batch)
+
+# Number of pages crawled over all partitions, in shared memory. Partitions
+# claim a place before recording a page, so the crawl stops at num_hits pages
+# in total however they are spread over the partitions, and a partition
+# whose hosts run out of urls leaves its share to the others
+class PageQuota:
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = multiprocessing.Value('q', 0)
+
+    # Claims a page. Returns False once limit pages have been claimed
+    def claim(self):
+        with self.count.get_lock():
+            if self.count.value >= self.limit:
+                return False
+            self.count.value += 1
+            return True
+
+    def exhausted(self):
+        return self.count.value >= self.limit
+
+# Decides when a partitioned crawl is over. Partitions report their router
+# counts and whether they are idle over a connection to the coordinator. The
+# crawl is over when every partition is idle with as many links received as
+# sent over all partitions, and two rounds of reports in a row agree, so no
+# link was in flight between them, or once the pages of the quota have all
+# been crawled
+class Coordinator:
+    def __init__(self, num_partitions, authkey, quota, address=('127.0.0.1', 0), interval=0.05):
+        self.num_partitions = num_partitions
+        self.quota = quota
+        self.interval = interval
+        self.listener = Listener(address, authkey=authkey)
+        self.address = self.listener.address
+
+    # Waits for the crawl to end, stops every partition and returns their stats.
+    # Raises RuntimeError if one of the partition processes exits before
+    # every partition has connected, after stopping those that had
+    def run(self, processes):
+        connections = self._accept(processes)
+        reports = {}
+        previous = None
+        failed = False
+        while not failed:
+            sleep(self.interval)
+            for connection in connections:
+                try:
+                    while connection.poll():
+                        kind, index, *report = connection.recv()
+                        reports[index] = report
+                except (EOFError, OSError):
+                    failed = True # A partition died, so stop the others
+            if failed or self.quota.exhausted():
+                break
+            if len(reports) < self.num_partitions:
+                continue
+            current = tuple((sent, received, idle) for sent, received, idle in (reports[i] for i in range(self.num_partitions)))
+            totals = [sum(values) for values in zip(*current)]
+            if totals[0] == totals[1] and totals[2] == self.num_partitions and current == previous:
+                break
+            previous = current
+        return self._stop(connections)
+
+    # Accepts a connection from every partition. Listener.accept has no
+    # timeout, so it runs on a thread while the processes are checked
+    def _accept(self, processes):
+        connections = []
+        def accept():
+            try:
+                while len(connections) < self.num_partitions:
+                    connections.append(self.listener.accept())
+            except OSError:
+                pass # Listener closed
+        acceptor = threading.Thread(target=accept, daemon=True)
+        acceptor.start()
+        while True:
+            acceptor.join(self.interval)
+            if not acceptor.is_alive():
+                if len(connections) < self.num_partitions:
+                    self._stop(connections)
+                    raise RuntimeError("A partition failed to connect to the coordinator")
+                return connections
+            for index, process in enumerate(processes):
+                if process.exitcode is not None:
+                    self._stop(list(connections))
+                    raise RuntimeError(f"Partition {index} exited with code {process.exitcode} before every partition connected")
+
+    # Stops the partitions and returns their stats
+    def _stop(self, connections):
+        stats = []
+        for connection in connections:
+            try:
+                connection.send("stop")
+                while True:
+                    message = connection.recv()
+                    if message[0] == "done":
+                        stats.append(message[2])
+                        break
+            except (EOFError, OSError):
+                pass
+            connection.close()
+        self.listener.close()
+        return stats
+
+# Runs one partition of a crawl: a crawler that only crawls the hosts it
+# owns, with its own frontier, politeness state and robots.txt cache, and
+# results in its own directory. Runs in a process started by crawl_partitioned
+def run_partition(index, addresses, coordinator_address, authkey, quota, config):
+    directory = config["directory"]
+    os.makedirs(directory, exist_ok=True)
+    sink = DocumentSink(directory, chunk_size=config["chunk_size"], compression=config["compression"], fsync=config["fsync"])
+    ready = threading.Event() # Set once the crawler exists, as peers may send links before then
+    crawling = threading.Event()
+    crawling.set()
+    crawler = None
+
+    def deliver(batch):
+        ready.wait()
+        if crawling.is_set():
+            crawler.frontier.add_urls(batch)
+            if crawler.scheduler is not None:
+                crawler.scheduler.wake()
+
+    router = Router(index, addresses, authkey, deliver)
+    backend = get_backend(config["backend"])
+    seeds = [url for url in config["seeds"] if router.owns(url)]
+    crawler = backend(seeds, config["related_terms"], robots_cache_path=os.path.join(directory, 'robots_cache.json'),
+                      extractor=config["extractor"], frontier_capacity=config["frontier_capacity"], spill_dir=directory,
+                      sink=sink, router=router, weights=config["weights"],
+                      dedupe=config["dedupe"], quota=quota)
+    ready.set()
+    coordinator = Client(coordinator_address, authkey=authkey)
+    stopped = threading.Event()
+
+    # Flushes the router and reports to the coordinator until told to stop.
+    # If that fails, as when a peer partition never came up, the partition stops too
+    def report():
+        try:
+            while not stopped.is_set():
+                router.flush()
+                sent, received, buffered = router.counts()
+                idle = not crawling.is_set() or (crawler.scheduler is not None and crawler.scheduler.idle())
+                coordinator.send(("status", index, sent, received, idle and not buffered))
+                if coordinator.poll(0.05) and coordinator.recv() == "stop":
+                    break
+        finally:
+            stopped.set()
+            if crawler.scheduler is not None:
+                crawler.scheduler.close()
+
+    reporter = threading.Thread(target=report, daemon=True)
+    reporter.start()
+    try:
+        crawler.crawl(config["num_hits"], config["concurrency"])
+        crawling.clear() # Links sent here from now on are counted, then dropped
+        stopped.wait()
+    finally:
+        crawling.clear()
+        sink.close()
+        router.close()
+    reporter.join()
+    coordinator.send(("done", index, crawler.get_stats()))
+    coordinator.close()
+
+# Runs a crawl split over num_partitions processes on this machine. Each
+# partition owns the hosts that partition_of assigns it, and the partitions
+# crawl num_hits pages between them. Partition i keeps its files in results_dir/partition_i, and
+# once every partition has stopped their results files and link graphs are
+# merged into results_dir. Returns the summed stats of the partitions
+def crawl_partitioned(num_partitions, seeds, related_terms, num_hits, results_dir, backend="threaded", concurrency=None,
+                      extractor="streaming", chunk_size=500, compression=None, fsync="chunk", frontier_capacity=None,
+                      weights=None, dedupe=None, host="127.0.0.1", first_port=0):
+    backend_class = get_backend(backend)
+    if not backend_class.partitionable:
+        raise ValueError(f"The {backend} backend cannot run a partitioned crawl")
+    results_dir = os.path.abspath(results_dir)
+    authkey = os.urandom(16)
+    quota = PageQuota(num_hits)
+    coordinator = Coordinator(num_partitions, authkey, quota, (host, 0))
+    addresses = [(host, first_port + i if first_port else _free_port(host)) for i in range(num_partitions)]
+    directories = [os.path.join(results_dir, f"partition_{i}") for i in range(num_partitions)]
+    processes = []
+    for i in range(num_partitions):
+        config = {"directory": directories[i], "backend": backend, "seeds": seeds, "related_terms": related_terms,
+                  "num_hits": num_hits, "concurrency": concurrency or backend_class.default_concurrency, "extractor": extractor,
+                  "chunk_size": chunk_size, "compression": compression, "fsync": fsync, "frontier_capacity": frontier_capacity,
+                  "weights": weights, "dedupe": dedupe}
+        process = multiprocessing.Process(target=run_partition, args=(i, addresses, coordinator.address, authkey, quota, config))
+        process.start()
+        processes.append(process)
+    try:
+        stats = coordinator.run(processes)
+    except RuntimeError:
+        for process in processes:
+            process.terminate() # Those that connected have already stopped, the rest never will
+        raise
+    finally:
+        for process in processes:
+            process.join()
+    merge_partitions(results_dir, directories)
+    return merge_stats(stats)
+
+def _free_port(host):
+    with Listener((host, 0)) as listener:
+        return listener.address[1]
+
+# Moves the results files of each partition into results_dir and merges the
+# partitions' link graphs into results_dir/graph. Results files and a graph
+# an earlier crawl left in results_dir are replaced, unless resume is set,
+# when the chunks are numbered after theirs and the graph is extended. The
+# partition directories keep their robots.txt caches
+def merge_partitions(results_dir, directories, resume=False):
+    if resume:
+        chunk = next_chunk_number(results_dir)
+    else:
+        for path in results_files(results_dir):
+            os.remove(path)
+        chunk = 1
+    for directory in directories:
+        for path in results_files(directory):
+            name = os.path.basename(path)
+            suffix = name[CHUNK_FILE.match(name).end():] # The compression suffix, if any
+            os.replace(path, os.path.join(results_dir, f"results_{chunk}.txt{suffix}"))
+            chunk += 1
+    graph = LinkGraphWriter(os.path.join(results_dir, "graph"), resume=resume)
+    for directory in directories:
+        graph.merge(os.path.join(directory, "graph"))
+    graph.close()
+    for directory in directories:
+        shutil.rmtree(os.path.join(directory, "graph"), ignore_errors=True)
+
+# Sums the stats of the partitions, recomputing the connection reuse and the
+# dedupe rates from the sums. Each partition only finds near duplicates among
+# the pages it crawled itself
+def merge_stats(stats):
+    merged = {}
+    for partition_stats in stats:
+        for name, value in partition_stats.items():
+            merged[name] = merged.get(name, 0) + value
+    requests = merged.get("requests", 0)
+    if "connection_reuse_ratio" in merged:
+        merged["connection_reuse_ratio"] = 1 - merged.get("connections", 0) / requests if requests else 0
+    if "dedupe_lookups" in merged:
+        add_rates(merged)
+    return merged
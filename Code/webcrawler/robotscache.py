@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+from time import time
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+from urllib.request import urlopen
+from urllib.robotparser import RobotFileParser
+
+# A parsed robots.txt for one scheme+host, along with the
+# raw lines it was built from so it can be written to disk
+class RobotsEntry:
+    def __init__(self, status, lines, fetched, expires):
+        self.status = status
+        self.lines = lines
+        self.fetched = fetched
+        self.expires = expires
+        self.parser = RobotFileParser()
+        if status in (401, 403) or status is None:
+            # Access denied, or robots.txt could not be fetched. Disallow everything
+            self.parser.disallow_all = True
+        elif 400 <= status < 500:
+            # No robots.txt. Allow everything
+            self.parser.allow_all = True
+        else:
+            self.parser.parse(lines)
+
+    def to_json(self):
+        return {"status": self.status, "lines": self.lines, "fetched": self.fetched, "expires": self.expires}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["status"], data["lines"], data["fetched"], data["expires"])
+
+# Shared robots.txt cache keyed by scheme+host. Successful fetches are kept for
+# ttl seconds, failures (5xx, timeouts, connection errors) for error_ttl seconds.
+# Concurrent requests for the same host wait on a single fetch. If path is given,
+# the cache is loaded from and saved to that file so restarted crawls start warm
+class RobotsCache:
+    def __init__(self, ttl=86400, error_ttl=3600, timeout=15, user_agent="*", path=None, session=None):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.session = session
+        self.path = os.path.abspath(path) if path is not None else None
+        self.entries = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    # Returns the RobotsEntry for the host of the passed url, fetching it if needed
+    def get(self, url):
+        parsed_url = urlparse(url)
+        key = parsed_url.scheme.lower() + "://" + parsed_url.netloc.lower()
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry.expires > time():
+                    return entry
+                event = self.in_flight.get(key)
+                if event is None:
+                    # This thread fetches; the others wait for it
+                    event = threading.Event()
+                    self.in_flight[key] = event
+                    break
+            event.wait()
+
+        try:
+            entry = self._fetch(key)
+            with self.lock:
+                self.entries[key] = entry
+            return entry
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            event.set()
+
+    def _fetch(self, key):
+        if self.session is not None:
+            return self._fetch_with_session(key)
+        now = time()
+        try:
+            with urlopen(key + "/robots.txt", timeout=self.timeout) as res:
+                lines = res.read().decode("utf-8", errors="replace").splitlines()
+                return RobotsEntry(res.status, lines, now, now + self.ttl)
+        except HTTPError as e:
+            if e.code >= 500:
+                return RobotsEntry(None, [], now, now + self.error_ttl)
+            return RobotsEntry(e.code, [], now, now + self.ttl)
+        except Exception:
+            return RobotsEntry(None, [], now, now + self.error_ttl)
+
+    # Fetches robots.txt over the crawler's pooled SessionPool connections
+    def _fetch_with_session(self, key):
+        now = time()
+        try:
+            res = self.session.get(key + "/robots.txt", timeout=self.timeout)
+        except Exception:
+            return RobotsEntry(None, [], now, now + self.error_ttl)
+        if res.status_code >= 500:
+            return RobotsEntry(None, [], now, now + self.error_ttl)
+        if res.status_code >= 400:
+            return RobotsEntry(res.status_code, [], now, now + self.ttl)
+        return RobotsEntry(res.status_code, res.text.splitlines(), now, now + self.ttl)
+
+    # Checks if the passed url may be crawled
+    def can_fetch(self, url):
+        return self.get(url).parser.can_fetch(self.user_agent, url)
+
+    # Returns the minimum number of seconds between requests
+    # to the host of the passed url, or 0 if none is given
+    def delay(self, url):
+        parser = self.get(url).parser
+        crawl_delay = parser.crawl_delay(self.user_agent)
+        if crawl_delay is not None:
+            return float(crawl_delay)
+        request_rate = parser.request_rate(self.user_agent)
+        if request_rate is not None and request_rate.requests > 0:
+            return request_rate.seconds / request_rate.requests
+        return 0
+
+    # Writes unexpired entries to the cache file
+    def save(self):
+        if self.path is None:
+            return
+        now = time()
+        with self.lock:
+            data = {key: entry.to_json() for key, entry in self.entries.items() if entry.expires > now}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self.path)
+
+    # Reads unexpired entries from the cache file
+    def load(self):
+        now = time()
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        with self.lock:
+            for key, value in data.items():
+                if value["expires"] > now:
+                    self.entries[key] = RobotsEntry.from_json(value)
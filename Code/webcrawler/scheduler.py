@@ -0,0 +1,161 @@
+from collections import deque
+import heapq
+import threading
+from time import time
+from urllib.parse import urlparse
+
+# Host-aware scheduler that sits between the Frontier and the Crawler, in the
+# style of Mercator's back queues. Urls are pulled from the frontier in priority
+# order and routed to a queue for their host. Hosts wait in a heap keyed by the
+# time they may next be fetched, and a host is checked out while one of its urls
+# is being crawled, so each host has at most one request in flight. Crawl-delay
+# and Request-rate from robots.txt set the gap between requests to a host.
+# A host's back queue is only refilled once it is empty, with at most
+# max_per_host urls, so the rest stay in the frontier and keep their priority.
+# With wait_when_empty, running out of urls does not end the crawl, since
+# urls may still arrive from other partitions; it ends on close()
+class HostScheduler:
+    def __init__(self, frontier, robots, default_delay=0, refill_batch=100, max_per_host=5, next_fetch=None, wait_when_empty=False):
+        self.frontier = frontier
+        self.robots = robots
+        self.default_delay = default_delay
+        self.refill_batch = refill_batch
+        self.max_per_host = max_per_host
+        self.back_queues = {} # Urls waiting to be crawled, per host
+        self.ready = [] # Heap of (next allowed fetch time, host)
+        self.scheduled = set() # Hosts currently in the ready heap
+        self.checked_out = set() # Hosts with a url being crawled
+        self.delays = {} # Minimum seconds between requests, per host
+        self.next_fetch = next_fetch if next_fetch is not None else {} # Earliest time each host may be contacted again
+        self.wait_when_empty = wait_when_empty
+        self.drained = False # Whether the last get_url found no urls and nothing in flight
+        self.closed = False
+        self.condition = threading.Condition()
+        self.wake_at = None # Time the thread in a timed wait wakes up, None if there is none
+        self.stalled = False # Whether the last refill queued nothing, until a back queue empties or urls are added
+
+    # Returns the next url whose host may be fetched now, waiting if every
+    # queued host is still cooling down. Returns None once the frontier and
+    # all back queues are empty with nothing in flight, or after close().
+    # Idle threads are woken one at a time, as urls become available, rather
+    # than all at once. Only the thread waiting for the earliest cooling host
+    # sleeps with a timeout; the others wait to be notified. A thread that
+    # leaves the timed wait to take a url hands it on to another idle thread
+    def get_url(self):
+        with self.condition:
+            while not self.closed:
+                now = time()
+                if (not self.ready or self.ready[0][0] > now) and not self.stalled:
+                    self.stalled = not self._refill(now)
+                if self.ready and self.ready[0][0] <= now:
+                    _, host = heapq.heappop(self.ready)
+                    self.drained = False
+                    self.scheduled.discard(host)
+                    self.checked_out.add(host)
+                    queue = self.back_queues[host]
+                    url = queue.popleft()
+                    if not queue:
+                        del self.back_queues[host]
+                        self.stalled = False
+                    # Another host is ready for an idle thread, or one is cooling
+                    # down with no thread in a timed wait for it, as when this
+                    # thread was the timed waiter and was woken by a notify
+                    if self.ready and (self.ready[0][0] <= now or self.wake_at is None):
+                        self.condition.notify()
+                    return url
+                if not self.ready and not self.checked_out:
+                    if self.wait_when_empty:
+                        self.drained = True
+                        self.condition.wait() # Until wake() or close()
+                        continue
+                    self.condition.notify_all() # The crawl is over, for every thread
+                    return None
+                self._wait()
+            return None
+
+    # Sleeps until notified, or until the earliest cooling host is ready if
+    # no other thread is already waiting for it
+    def _wait(self):
+        deadline = self.ready[0][0] if self.ready else None
+        if deadline is None or (self.wake_at is not None and self.wake_at <= deadline):
+            self.condition.wait()
+            return
+        self.wake_at = deadline
+        self.condition.wait(deadline - time())
+        if self.wake_at == deadline:
+            self.wake_at = None
+
+    # Called by the Crawler once it is done with a url returned by get_url.
+    # If the host was contacted, it may not be fetched again until its delay passes
+    def release(self, url, contacted=True):
+        host = urlparse(url).netloc.lower()
+        # Looked up before taking the lock, as it may need robots.txt
+        delay = self._delay(url, host) if contacted else 0
+        with self.condition:
+            self.checked_out.discard(host)
+            if contacted:
+                self.next_fetch[host] = time() + delay
+            if host in self.back_queues:
+                self._schedule(host, self.next_fetch.get(host, 0))
+            else:
+                self.stalled = False # Its urls found on the page can be queued now
+            # One idle thread takes the released host, or finds the crawl is over
+            self.condition.notify()
+
+    # Called after urls were added to the frontier from outside the crawl
+    def wake(self):
+        with self.condition:
+            self.drained = False
+            self.stalled = False
+            self.condition.notify_all()
+
+    # Returns whether there is nothing left to crawl until more urls are added
+    def idle(self):
+        with self.condition:
+            return self.closed or (self.drained and not self.checked_out)
+
+    # Stops the scheduler. Waiting and future get_url calls return None
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    # Takes up to refill_batch urls from the frontier. Hosts with an empty back
+    # queue get at most max_per_host of them; urls for the other hosts go back
+    # to the frontier. Stops early once a host is ready. Returns whether any
+    # url was queued
+    def _refill(self, now):
+        filling = set() # Hosts whose queue was empty when this refill began
+        deferred = []
+        for _ in range(self.refill_batch):
+            url = self.frontier.get_next_url()
+            if url is None:
+                break
+            host = urlparse(url).netloc.lower()
+            if host not in self.back_queues:
+                self.back_queues[host] = deque()
+                filling.add(host)
+                if host not in self.checked_out:
+                    self._schedule(host, self.next_fetch.get(host, 0))
+            elif host not in filling or len(self.back_queues[host]) >= self.max_per_host:
+                deferred.append(url)
+                continue
+            self.back_queues[host].append(url)
+            if self.ready and self.ready[0][0] <= now:
+                break
+        if deferred:
+            self.frontier.requeue(deferred)
+        return bool(filling)
+
+    def _schedule(self, host, next_time):
+        if host not in self.scheduled:
+            self.scheduled.add(host)
+            heapq.heappush(self.ready, (next_time, host))
+
+    def _delay(self, url, host):
+        if host not in self.delays:
+            try:
+                self.delays[host] = max(self.default_delay, self.robots.delay(url))
+            except Exception:
+                self.delays[host] = self.default_delay
+        return self.delays[host]
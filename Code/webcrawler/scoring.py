@@ -0,0 +1,96 @@
+import json
+import numpy as np
+
+TRUSTED_SUFFIXES = (".org", ".edu", ".gov")
+# Batches smaller than this are updated one row at a time, as the per-call
+# overhead of NumPy outweighs what the vectorized expression saves
+MIN_BATCH = 64
+
+# Weights of the features a frontier url is scored on:
+#   term_match      per related term matched by the url segments or anchor words
+#   wave            divided by the wave the url was found in
+#   trusted_domain  if the url is on a .org, .edu or .gov domain
+#   inlink          per distinct inlink
+#   trusted_inlink  per distinct inlink from a .org, .edu or .gov url
+DEFAULT_WEIGHTS = {"term_match": 75, "wave": 1000, "trusted_domain": 30, "inlink": 5, "trusted_inlink": 3}
+
+# Reads weights from a JSON object, filling in the defaults for any not given
+def load_weights(path):
+    with open(path) as file:
+        weights = json.load(file)
+    unknown = set(weights) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown weights: {', '.join(sorted(unknown))}")
+    return {**DEFAULT_WEIGHTS, **weights}
+
+# The priority of a url from its features. Works on single values and, with
+# one operation per term, on whole NumPy columns
+def score(weights, term_matches, wavenum, trusted, inlinks, trusted_inlinks):
+    return (weights["term_match"] * term_matches + weights["wave"] * (1 / wavenum) + weights["trusted_domain"] * trusted
+            + weights["inlink"] * inlinks + weights["trusted_inlink"] * trusted_inlinks)
+
+# Scoring features of queued urls, stored column by column in NumPy arrays,
+# one row per url. Rows of urls that leave the queue are reused. Changed rows
+# are rescored together, so a batch of inlinks or new weights costs one
+# vectorized expression rather than a Python call per url
+class ScoreTable:
+    def __init__(self, weights=None, capacity=1024):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.term_matches = np.zeros(capacity, np.int32)
+        self.wavenum = np.ones(capacity, np.int32)
+        self.trusted = np.zeros(capacity, np.int8)
+        self.inlinks = np.zeros(capacity, np.int32)
+        self.trusted_inlinks = np.zeros(capacity, np.int32)
+        self.live = np.zeros(capacity, np.bool_)
+        self.size = 0 # Rows in use or freed; rows past it have never been used
+        self.free_rows = []
+
+    def __len__(self):
+        return self.size - len(self.free_rows)
+
+    # Adds a url's features and returns its row
+    def add(self, term_matches, wavenum, trusted, inlinks=0, trusted_inlinks=0):
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            if self.size == len(self.live):
+                self._grow()
+            row = self.size
+            self.size += 1
+        self.term_matches[row] = term_matches
+        self.wavenum[row] = wavenum
+        self.trusted[row] = trusted
+        self.inlinks[row] = inlinks
+        self.trusted_inlinks[row] = trusted_inlinks
+        self.live[row] = True
+        return row
+
+    def remove(self, row):
+        self.live[row] = False
+        self.free_rows.append(row)
+
+    # Counts one new inlink for each of rows; trusted says which were trusted.
+    # A row may appear more than once
+    def add_inlinks(self, rows, trusted):
+        if len(rows) < MIN_BATCH:
+            for row, is_trusted in zip(rows, trusted):
+                self.inlinks[row] += 1
+                self.trusted_inlinks[row] += is_trusted
+        else:
+            np.add.at(self.inlinks, rows, 1)
+            np.add.at(self.trusted_inlinks, rows, trusted)
+
+    # Returns the priorities of the passed rows, or of every live row, in
+    # one vectorized expression
+    def rescore(self, rows=None):
+        if rows is None:
+            rows = np.flatnonzero(self.live[:self.size])
+        return score(self.weights, self.term_matches[rows], self.wavenum[rows], self.trusted[rows],
+                     self.inlinks[rows], self.trusted_inlinks[rows])
+
+    def _grow(self):
+        for name in ("term_matches", "wavenum", "trusted", "inlinks", "trusted_inlinks", "live"):
+            column = getattr(self, name)
+            grown = np.ones(2 * len(column), column.dtype) if name == "wavenum" else np.zeros(2 * len(column), column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
@@ -0,0 +1,73 @@
+import requests as req
+from requests.adapters import HTTPAdapter
+import threading
+from urllib3.util.retry import Retry
+
+# Thread-safe HTTP session layer shared by all crawler threads. Each thread
+# gets its own requests.Session, but they all mount one HTTPAdapter, so
+# keep-alive connections are pooled per host and reused across threads.
+# pool_connections bounds the number of hosts with a pool, pool_maxsize the
+# connections kept open to each host. Failed connects, read errors and
+# 429/5xx responses are retried with exponential backoff
+class SessionPool:
+    def __init__(self, pool_connections=100, pool_maxsize=10, connect_timeout=5, read_timeout=10,
+                 retries=2, backoff_factor=0.5, user_agent=None):
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries, redirect=False,
+                      backoff_factor=backoff_factor, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(["HEAD", "GET"]), raise_on_status=False)
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.timeout = (connect_timeout, read_timeout)
+        self.user_agent = user_agent
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+        # Pools dropped from the pool manager take their counters with
+        # them, so their totals are recorded before they are closed
+        self.closed_connections = 0
+        self.closed_requests = 0
+        pools = self.adapter.poolmanager.pools
+        dispose = pools.dispose_func
+        def record_and_dispose(pool):
+            with self.lock:
+                self.closed_connections += pool.num_connections
+                self.closed_requests += pool.num_requests
+            dispose(pool)
+        pools.dispose_func = record_and_dispose
+
+    # Returns the calling thread's session
+    def session(self):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = req.Session()
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            if self.user_agent is not None:
+                session.headers["User-Agent"] = self.user_agent
+            self.local.session = session
+        return session
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session().head(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session().get(url, **kwargs)
+
+    # Returns the number of requests sent, connections opened, and the share
+    # of requests that reused an already open connection
+    def connection_stats(self):
+        pools = self.adapter.poolmanager.pools
+        with self.lock:
+            connections = self.closed_connections
+            requests = self.closed_requests
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    requests += pool.num_requests
+        reuse_ratio = 1 - connections / requests if requests else 0
+        return {"requests": requests, "connections": connections, "connection_reuse_ratio": reuse_ratio}
+
+    def close(self):
+        self.adapter.close()
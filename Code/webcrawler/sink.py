@@ -0,0 +1,156 @@
+import gzip
+from .linkgraph import LinkGraphWriter
+import os
+import queue
+import re
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None # zstd compression is unavailable
+
+COMPRESSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"} # File suffix for each compression
+FSYNC_POLICIES = ("never", "chunk", "always")
+CHUNK_FILE = re.compile(r"results_(\d+)\.txt")
+
+# Formats a crawled page as a document in the results files
+def format_document(url, title, text):
+    if (title != ""):
+        return f"<DOC>\n<DOCNO>{url}</DOCNO>\n<HEAD>{title}</HEAD>\n<TEXT>{text}</TEXT>\n</DOC>\n"
+    return f"<DOC>\n<DOCNO>{url}</DOCNO>\n<TEXT>{text}</TEXT>\n</DOC>\n"
+
+# Returns the number after the highest results chunk in a directory
+def next_chunk_number(directory):
+    numbers = [int(match.group(1)) for match in map(CHUNK_FILE.match, os.listdir(directory)) if match]
+    return max(numbers, default=0) + 1
+
+# One output file, optionally compressed. Text is encoded and written through
+# a large buffer, so each document costs one write call
+class ChunkFile:
+    def __init__(self, path, compression=None):
+        self.raw = open(path + COMPRESSIONS[compression], 'wb', buffering=1 << 20)
+        if compression == "gzip":
+            self.stream = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6)
+        elif compression == "zstd":
+            self.stream = zstandard.ZstdCompressor().stream_writer(self.raw, closefd=False)
+        else:
+            self.stream = self.raw
+
+    def write(self, text):
+        self.stream.write(text.encode("utf-8"))
+
+    # Pushes everything written so far to disk. A compressed stream is
+    # flushed to a block boundary first, so the synced data can be decoded
+    def sync(self):
+        if self.stream is not self.raw:
+            self.stream.flush()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+
+    def close(self, fsync=False):
+        if self.stream is not self.raw:
+            self.stream.close() # Ends the compressed stream, leaving the file open
+        if fsync:
+            self.raw.flush()
+            os.fsync(self.raw.fileno())
+        self.raw.close()
+
+# Writer stage that streams crawled pages to disk as they arrive, instead of
+# holding them until the crawl ends. Documents are queued by the crawler and
+# written by a background thread. The contents of each crawled url go to
+# rotating chunk files of chunk_size pages, results_{chunk number}.txt, and
+# the directed edges from it to the link graph in the graph directory, which
+# is built when the sink is closed. fsync is one of "never", "chunk" (when a
+# chunk file is completed) or "always" (after every document). The queue is
+# bounded, so a slow disk holds back the crawl rather than growing memory.
+# With resume, chunk numbers continue after the existing results files and
+# the link graph is extended
+class DocumentSink:
+    def __init__(self, directory=".", chunk_size=500, compression=None, fsync="chunk", resume=False, max_pending=1000):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self.fsync = fsync
+        self.chunk = next_chunk_number(directory) if resume else 1
+        self.chunk_count = 0 # Documents in the current chunk
+        self.written = 0
+        self.file = None
+        self.graph = LinkGraphWriter(os.path.join(directory, "graph"), resume)
+        self.error = None
+        self.queue = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # Queues a crawled page to be written
+    def write(self, url, title, text, outlinks):
+        self._check()
+        self.queue.put((url, title, text, outlinks))
+
+    # Waits until every queued page is written and synced to disk
+    def flush(self):
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+        self._check()
+
+    # Writes the remaining pages, closes the current chunk and builds the link graph
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self._check()
+
+    def _check(self):
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                self._guard(self._close_chunk)
+                self._guard(self.graph.close, self.fsync != "never")
+                return
+            if isinstance(entry, threading.Event):
+                self._guard(self._sync)
+                entry.set()
+            elif self.error is None:
+                self._guard(self._write, *entry)
+
+    # Runs a write step, keeping its error to be raised on the crawler's side
+    def _guard(self, step, *args):
+        try:
+            step(*args)
+        except Exception as e:
+            self.error = e
+
+    def _write(self, url, title, text, outlinks):
+        if self.file is None:
+            self.file = ChunkFile(os.path.join(self.directory, f"results_{self.chunk}.txt"), self.compression)
+        self.file.write(format_document(url, title, text))
+        self.graph.add_page(url, [link for link, anchor in outlinks])
+        if self.fsync == "always":
+            self._sync()
+        self.written += 1
+        self.chunk_count += 1
+        if self.chunk_count >= self.chunk_size:
+            self._close_chunk()
+
+    def _sync(self):
+        if self.file is not None:
+            self.file.sync()
+        self.graph.sync()
+
+    def _close_chunk(self):
+        if self.file is None:
+            return
+        self.file.close(fsync=self.fsync != "never")
+        self.file = None
+        self.chunk += 1
+        self.chunk_count = 0
@@ -0,0 +1,41 @@
+import threading
+
+# Thread-safe counters for a crawl, e.g. pages crawled or rejected. Each
+# thread counts into its own dict, so incr takes no lock; the lock is only
+# taken when a thread first counts, and to sum the dicts for a read
+class CrawlStats:
+    def __init__(self):
+        self.local = threading.local()
+        self.thread_counters = [] # Counters of every thread that has counted
+        self.lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        counters = getattr(self.local, "counters", None)
+        if counters is None:
+            counters = self.local.counters = {}
+            with self.lock:
+                self.thread_counters.append(counters)
+        counters[name] = counters.get(name, 0) + amount
+
+    def get(self, name):
+        return self.snapshot().get(name, 0)
+
+    # Returns a copy of the counters, merged with any extra values passed in
+    def snapshot(self, **extra):
+        with self.lock:
+            thread_counters = list(self.thread_counters)
+        snapshot = {}
+        for counters in thread_counters:
+            for name, value in list(counters.items()):
+                snapshot[name] = snapshot.get(name, 0) + value
+        snapshot.update(extra)
+        return snapshot
+
+# Formats a stats dict as one "name: value" line per entry
+def format_stats(stats):
+    lines = []
+    for name, value in sorted(stats.items()):
+        if isinstance(value, float):
+            value = f"{value:.3f}"
+        lines.append(f"{name}: {value}")
+    return "\n".join(lines)
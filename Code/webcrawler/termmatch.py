@@ -0,0 +1,74 @@
+from .analysis import stem
+from collections import deque
+from functools import lru_cache
+import re
+from urllib.parse import unquote
+
+TOKEN = re.compile(r"[^\W_]+") # Runs of letters and digits, so url paths split on /, _, -, . and the like
+
+# Lowercased, Porter stemmed tokens of a text, through the stem cache shared
+# with analysis. Porter leaves numbers as they are, and the ids in urls would
+# only crowd the cache, so they skip it
+def stem_tokens(text):
+    return [token if token.isdigit() else stem(token) for token in TOKEN.findall(text.lower())]
+
+# Matches a fixed set of related terms against url paths and anchor text.
+# Terms are tokenized and stemmed like the text they are matched against, so
+# a multi-word term such as "Mitt Romney" matches "Mitt_Romney" in a path or
+# "mitt romney" in an anchor. The terms are compiled once into an Aho-Corasick
+# automaton over stems: goto holds the transitions of each state, fail the
+# state to fall back to when no transition fits, and output the terms that
+# end at each state. A text is matched in a single pass over its tokens
+class TermMatcher:
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [frozenset()]
+        # Terms that stem to the same tokens count as one term
+        patterns = (tuple(stem_tokens(term)) for term in terms)
+        self.patterns = list(dict.fromkeys(pattern for pattern in patterns if pattern))
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for token in pattern:
+                if token not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(frozenset())
+                    self.goto[state][token] = len(self.goto) - 1
+                state = self.goto[state][token]
+            self.output[state] |= {index}
+
+        # Breadth first, so the fail state of every shallower state is known
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token, 0)
+                self.output[child] |= self.output[self.fail[child]]
+
+    # Indexes of the terms found in a sequence of stems
+    def matches(self, stems):
+        goto, fail, output = self.goto, self.fail, self.output
+        found = set()
+        state = 0
+        for token in stems:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+    # Number of terms found in the path (and query) of a url plus the number found in its anchor text
+    def count(self, url, anchor=""):
+        path = url.partition("//")[2].partition("/")[2]
+        return len(self.matches(stem_tokens(unquote(path)))) + len(self.matches(stem_tokens(anchor)))
+
+# Matcher for a tuple of terms, shared by everything scoring against the same terms
+@lru_cache(maxsize=16)
+def compile_terms(terms):
+    return TermMatcher(terms)
@@ -0,0 +1,50 @@
+from ..benchmarks.bulkindex import make_documents
+from ..benchmarks.stubes import StubElasticsearch
+from ..bulkindex import BulkIndexer
+import unittest
+
+# Indexes documents into the Elasticsearch stub, which rejects every 7th bulk
+# request and every 50th document with a 429. The BulkIndexer has to retry
+# them until every document arrives, and put back the index settings it
+# changed for the bulk load
+class BulkIndexerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = StubElasticsearch(port=19300, latency=0, per_doc=0, reject_every=7, reject_doc_every=50)
+        cls.stub.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+
+    def index(self, index, documents, workers):
+        self.stub.create_index(index)
+        with BulkIndexer(self.stub.url, index, max_docs=50, workers=workers, backoff=0.01) as bulk:
+            for doc_id, document in documents.items():
+                bulk.index(doc_id, document)
+        return bulk
+
+    def test_rejected_requests_are_retried(self):
+        rejected = self.stub.rejected
+        bulk = self.index("retried", make_documents(500), workers=4)
+        self.assertGreater(self.stub.rejected, rejected)
+        self.assertGreater(bulk.retries, 0)
+        self.assertEqual(bulk.failed, [])
+
+    def test_every_document_arrives(self):
+        documents = make_documents(500, seed=1)
+        for workers in [1, 4]:
+            with self.subTest(workers=workers):
+                self.stub.documents.clear()
+                bulk = self.index(f"arrives{workers}", documents, workers)
+                self.assertEqual(bulk.docs, len(documents))
+                self.assertEqual(self.stub.documents, documents)
+
+    def test_settings_are_restored(self):
+        self.stub.settings_history.clear()
+        self.index("settings", make_documents(100), workers=2)
+        self.assertEqual(self.stub.settings_history[0], {"refresh_interval": "-1", "number_of_replicas": 0})
+        self.assertEqual(self.stub.settings["settings"], {"refresh_interval": "1s", "number_of_replicas": "1"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+from ..canonicalizeurls import canonicalize_many, canonicalize_url
+import random
+import re
+import unittest
+from urllib.parse import urlparse, urlunparse, urljoin
+
+# The uncached implementation, used as the reference output
+def reference_canonicalize_url(url, base=None):
+    parsed_url = urlparse(url)
+    scheme = parsed_url.scheme.lower()
+    domain = parsed_url.netloc.lower()
+    if (scheme == 'http' and parsed_url.port == 80) or (scheme == 'https' and parsed_url.port == 443):
+        domain = domain.split(':')[0]
+    if not parsed_url.netloc and base:
+        base_url = urlparse(base)
+        url = urljoin(base_url.geturl(), url)
+        parsed_url = urlparse(url)
+        scheme = parsed_url.scheme.lower()
+        domain = parsed_url.netloc.lower()
+    if scheme == 'https':
+        scheme = 'http'
+    url = urlunparse((scheme, domain, parsed_url.path, parsed_url.params, '', ''))
+    url = re.sub(r'([^:])//+', r'\1/', url)
+    return url
+
+bases = ["http://en.wikipedia.org/wiki/Mitt_Romney", "https://EN.Wikipedia.org:443/wiki/Boston",
+         "http://malegislature.gov:80/Legislators/Leadership/", "https://www.wbur.org/news/2023/09/07/guide?x=1#top",
+         "http://example.com", "ftp://files.example.com/pub/"]
+pieces = ["wiki", "Boston", "Mitt_Romney", "..", ".", "", "a;b", "%20", "Café", "index.html", "A B", "x\ty"]
+prefixes = ["", "/", "//", "./", "../", "http://", "https://", "HTTP://", "//cdn.example.com/", "mailto:", "#",
+            "?q=", "javascript:", " /", "http://en.wikipedia.org:80/", "https://secure.example.com:443/", "\n/"]
+suffixes = ["", "#section", "?a=1&b=2", "?a#b", "/", "//", ";params", "#", "?"]
+
+# Generates a random href out of fragments that exercise the edge cases of urlparse and urljoin
+def random_href(rng):
+    path = "/".join(rng.choice(pieces) for _ in range(rng.randint(0, 4)))
+    return rng.choice(prefixes) + path + rng.choice(suffixes)
+
+def random_page(rng, num_links):
+    return rng.choice(bases), [random_href(rng) for _ in range(num_links)]
+
+# Result of canonicalizing an href, or ValueError if it cannot be
+def outcome(canonicalize, href, base):
+    try:
+        return canonicalize(href, base)
+    except ValueError:
+        return ValueError
+
+# Property check: for random hrefs and bases, the cached single-url function
+# and the batch function must both match the reference implementation
+class CanonicalizeTest(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            base, hrefs = random_page(rng, 50)
+            expected = [outcome(reference_canonicalize_url, href, base) for href in hrefs]
+            self.assertEqual([outcome(canonicalize_url, href, base) for href in hrefs], expected, (base, hrefs))
+            valid = [href for href, result in zip(hrefs, expected) if result is not ValueError]
+            self.assertEqual(canonicalize_many(valid, base), [result for result in expected if result is not ValueError], (base, valid))
+
+if __name__ == '__main__':
+    unittest.main()
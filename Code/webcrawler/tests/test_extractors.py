@@ -0,0 +1,43 @@
+from ..extractors import EXTRACTORS
+import os
+import unittest
+
+URL = "http://example.com/wiki/page"
+
+# Markup the streaming extractor has to handle the same way BeautifulSoup does
+golden_pages = [
+    '<html><head><title>Mitt Romney</title></head><body><p>Governor of <a href="/wiki/Massachusetts">Massachusetts</a>.</p></body></html>',
+    '<p>outer <p>nested</p> tail</p><p/><p>   </p><p>\n\n</p>',
+    '<p>unclosed <a href="/a">link <b>bold</p> after</a><a href=/b>b</a>',
+    '<p>caf&eacute; &amp; &#233;&#x41; &bogus; &#150; AT&T</p>',
+    '<p>text<script>var x = "<p>not text</p>";</script><style>p {}</style><!-- comment --> more</p>',
+    '<p><![CDATA[data]]> <br> line<br/>break<img src="x.png"></br></p>',
+    '<pre>  keep\n  spaces  </pre><p><textarea>\n</textarea> </p>',
+    '<title>first</title><title>second</title><a href="">empty</a><a name="x">no href</a><a href="/c" href="/d">dupe</a>',
+    '<p><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>字</p><template><p>hidden</p></template>',
+]
+
+# Every extractor has to return the same outlinks, text and title as the
+# BeautifulSoup reference. Saved pages in the folder named by the HTML_CORPUS
+# environment variable are checked as well
+class ExtractorEquivalenceTest(unittest.TestCase):
+    def check(self, name, content):
+        expected = EXTRACTORS["soup"]().extract(content, URL)
+        for extractor_name, extractor_class in EXTRACTORS.items():
+            with self.subTest(page=name, extractor=extractor_name):
+                self.assertEqual(extractor_class().extract(content, URL), expected)
+
+    def test_golden_pages(self):
+        for i, page in enumerate(golden_pages):
+            self.check(f"golden_{i}", page.encode('utf-8'))
+
+    @unittest.skipUnless(os.environ.get("HTML_CORPUS"), "HTML_CORPUS is not set")
+    def test_corpus(self):
+        for root, _, filenames in os.walk(os.environ["HTML_CORPUS"]):
+            for filename in sorted(filenames):
+                if filename.endswith((".html", ".htm")):
+                    with open(os.path.join(root, filename), 'rb') as file:
+                        self.check(filename, file.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+from ..frontier import Frontier
+from ..scheduler import HostScheduler
+import unittest
+
+# Robots stand-in that allows every host to be fetched without a delay
+class NoDelayRobots:
+    def delay(self, url):
+        return 0
+
+def single_host_frontier(num_urls):
+    frontier = Frontier(["romney"])
+    frontier.add_urls([(f"http://example.com/page{i}", "http://seed.com/", 1, "") for i in range(num_urls)])
+    return frontier
+
+# With one host, the back queue must only hold a few urls at a time, so the
+# rest stay in the frontier where newly found urls can still be ordered
+# ahead of them
+class SingleHostSchedulerTest(unittest.TestCase):
+    def test_frontier_keeps_queued_urls(self):
+        frontier = single_host_frontier(1000)
+        scheduler = HostScheduler(frontier, NoDelayRobots(), max_per_host=5)
+        for _ in range(50):
+            scheduler.release(scheduler.get_url())
+        self.assertLessEqual(sum(len(queue) for queue in scheduler.back_queues.values()), 5)
+        self.assertGreaterEqual(len(frontier.queue), 1000 - 50 - 5)
+
+    def test_new_url_is_crawled_ahead_of_queued_ones(self):
+        frontier = single_host_frontier(1000)
+        scheduler = HostScheduler(frontier, NoDelayRobots(), max_per_host=5)
+        scheduler.release(scheduler.get_url())
+        frontier.add_urls([("http://example.com/romney", "http://seed.com/", 1, "Mitt Romney")])
+        crawled = []
+        for _ in range(6):
+            crawled.append(scheduler.get_url())
+            scheduler.release(crawled[-1])
+        self.assertIn("http://example.com/romney", crawled)
+
+    def test_every_url_is_crawled_once(self):
+        frontier = single_host_frontier(200)
+        scheduler = HostScheduler(frontier, NoDelayRobots(), max_per_host=5)
+        crawled = []
+        url = scheduler.get_url()
+        while url is not None:
+            crawled.append(url)
+            scheduler.release(url)
+            url = scheduler.get_url()
+        self.assertEqual(sorted(crawled), sorted(f"http://example.com/page{i}" for i in range(200)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+from ..sink import format_document
+from ..trec import read_documents
+import os
+import tempfile
+import unittest
+
+# Documents whose fields span lines or hold markup of their own
+documents = [
+    ("http://example.com/a", "Mitt Romney", "Governor of Massachusetts"),
+    ("http://example.com/b", "", "no title"),
+    ("http://example.com/c", "Mitt Romney\n- Wikipedia", "title on two lines"),
+    ("http://example.com/d", "a </HEAD> b\n\nc", "<TEXT>text</TEXT> tail\n</DOC> on lines"),
+    ("http://example.com/e", "last", ""),
+]
+
+# Documents written with sink.format_document must read back unchanged, and
+# a document cut off at the end of the file is dropped
+class ReadDocumentsTest(unittest.TestCase):
+    def read(self, data):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results_1.txt")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(data)
+            return list(read_documents(path))
+
+    def test_round_trip(self):
+        self.assertEqual(self.read("".join(format_document(*document) for document in documents)), documents)
+
+    def test_cut_off_document_is_dropped(self):
+        data = format_document(*documents[0]) + format_document(*documents[2])
+        self.assertEqual(self.read(data[:data.index("- Wikipedia")]), documents[:1])
+
+if __name__ == '__main__':
+    unittest.main()
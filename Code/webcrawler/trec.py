@@ -0,0 +1,76 @@
+import gzip
+import os
+from .sink import CHUNK_FILE
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None # zstd compressed results files cannot be read
+
+# Returns the results chunk files in a directory, in chunk order
+def results_files(directory="."):
+    chunks = []
+    for name in os.listdir(directory):
+        match = CHUNK_FILE.fullmatch(name.removesuffix(".gz").removesuffix(".zst"))
+        if match:
+            chunks.append((int(match.group(1)), name))
+    return [os.path.join(directory, name) for number, name in sorted(chunks)]
+
+# Opens a results file as text, decompressing it if it was written compressed
+def open_results(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("reading zstd results files requires the zstandard package")
+        return zstandard.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+# Reads the documents of a results file one at a time, as (url, title, text)
+# tuples, so only the document being read is held in memory. Handles the
+# format sink.format_document writes:
+#
+#   <DOC>
+#   <DOCNO>url</DOCNO>
+#   <HEAD>title, which may span lines</HEAD>      (only when the page had a title)
+#   <TEXT>text, which may span lines</TEXT>
+#   </DOC>
+#
+# Page text is written unescaped, so the TEXT field only ends at a </TEXT>
+# that closes a line followed by the closing tag, and the HEAD field at the
+# first line that </HEAD> closes. Files written before the closing tag was
+# fixed end documents with "</DOC", and older files put the url between
+# spaces in the DOCNO line; both are accepted. A document cut off at the end
+# of the file is dropped
+def read_documents(path):
+    with open_results(path) as file:
+        url = None
+        title = ""
+        head = None # Lines of the HEAD field, until it is closed
+        text = None # Lines of the TEXT field, once it has started
+        for line in file:
+            if line.startswith('</DOC') and (text is None or text[-1].rstrip('\r\n').endswith('</TEXT>')):
+                if url is not None:
+                    yield url, title, _join_field(text, '</TEXT>')
+                url, title, head, text = None, "", None, None
+            elif text is not None:
+                text.append(line)
+            elif head is not None or line.startswith('<HEAD>'):
+                if head is None:
+                    head, line = [], line[6:]
+                head.append(line)
+                if line.rstrip('\r\n').endswith('</HEAD>'):
+                    title, head = _join_field(head, '</HEAD>'), None
+            elif line.startswith('<TEXT>'):
+                text = [line[6:]]
+            elif line.startswith('<DOCNO>'):
+                url = line[7:line.rfind('</DOCNO>')].strip()
+            elif line.startswith('<DOC>'):
+                url, title, head, text = None, "", None, None
+
+# Joins the lines of a field and strips its closing tag
+def _join_field(lines, tag):
+    if lines is None:
+        return ""
+    text = "".join(lines).rstrip('\r\n')
+    return text[:-len(tag)]
@@ -0,0 +1,195 @@
+from array import array
+from hashlib import blake2b
+import math
+
+# Returns a 64-bit fingerprint of a url. Zero is reserved
+# as the empty-slot marker in FingerprintSet, so it is remapped
+def url_fingerprint(url):
+    fingerprint = int.from_bytes(blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+    return fingerprint or 1
+
+# Open-addressing hash set of 64-bit fingerprints stored in a flat
+# array of unsigned longs. Uses 8 bytes per slot, no per-url objects
+class FingerprintSet:
+    def __init__(self, capacity=1 << 16, max_load=0.5):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.slots = array('Q', bytes(8 * size))
+        self.mask = size - 1
+        self.count = 0
+        self.max_load = max_load
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, fingerprint):
+        slots = self.slots
+        mask = self.mask
+        index = fingerprint & mask
+        while True:
+            slot = slots[index]
+            if slot == fingerprint:
+                return True
+            if slot == 0:
+                return False
+            index = (index + 1) & mask
+
+    # Adds a fingerprint. Returns True if it was not already present
+    def add(self, fingerprint):
+        slots = self.slots
+        mask = self.mask
+        index = fingerprint & mask
+        while True:
+            slot = slots[index]
+            if slot == fingerprint:
+                return False
+            if slot == 0:
+                break
+            index = (index + 1) & mask
+        slots[index] = fingerprint
+        self.count += 1
+        if self.count > self.max_load * len(slots):
+            self._grow()
+        return True
+
+    # Doubles the table and reinserts every stored fingerprint
+    def _grow(self):
+        old_slots = self.slots
+        self.slots = array('Q', bytes(16 * len(old_slots)))
+        self.mask = len(self.slots) - 1
+        self.count = 0
+        for fingerprint in old_slots:
+            if fingerprint:
+                self.add(fingerprint)
+
+# Open-addressing map from 64-bit fingerprints to 32-bit ids, laid out
+# like FingerprintSet with a parallel array of values. Uses 12 bytes per slot
+class FingerprintMap:
+    def __init__(self, capacity=1 << 16, max_load=0.5):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.slots = array('Q', bytes(8 * size))
+        self.values = array('I', bytes(4 * size))
+        self.mask = size - 1
+        self.count = 0
+        self.max_load = max_load
+
+    def __len__(self):
+        return self.count
+
+    # Returns the value stored for a fingerprint, or default
+    def get(self, fingerprint, default=None):
+        slots = self.slots
+        mask = self.mask
+        index = fingerprint & mask
+        while True:
+            slot = slots[index]
+            if slot == fingerprint:
+                return self.values[index]
+            if slot == 0:
+                return default
+            index = (index + 1) & mask
+
+    # Returns the value stored for a fingerprint, storing value first if there is none
+    def setdefault(self, fingerprint, value):
+        slots = self.slots
+        mask = self.mask
+        index = fingerprint & mask
+        while True:
+            slot = slots[index]
+            if slot == fingerprint:
+                return self.values[index]
+            if slot == 0:
+                break
+            index = (index + 1) & mask
+        slots[index] = fingerprint
+        self.values[index] = value
+        self.count += 1
+        if self.count > self.max_load * len(slots):
+            self._grow()
+        return value
+
+    # Doubles the table and reinserts every stored entry
+    def _grow(self):
+        old_slots, old_values = self.slots, self.values
+        self.slots = array('Q', bytes(16 * len(old_slots)))
+        self.values = array('I', bytes(8 * len(old_values)))
+        self.mask = len(self.slots) - 1
+        self.count = 0
+        for fingerprint, value in zip(old_slots, old_values):
+            if fingerprint:
+                self.setdefault(fingerprint, value)
+
+# Fixed-size Bloom filter over 64-bit fingerprints. The k bit
+# positions are derived from the fingerprint by double hashing
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_bits = num_bits
+        self.num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        self.bits = bytearray((num_bits + 7) // 8)
+
+    def _positions(self, fingerprint):
+        h1 = fingerprint & 0xFFFFFFFF
+        h2 = (fingerprint >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, fingerprint):
+        bits = self.bits
+        for position in self._positions(fingerprint):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, fingerprint):
+        bits = self.bits
+        for position in self._positions(fingerprint):
+            bits[position >> 3] |= 1 << (position & 7)
+
+# Set of urls the crawler has seen, stored as fingerprints. If bloom_capacity
+# is given, a Bloom filter sits in front of the exact set and answers most
+# lookups for unseen urls without probing the table. With exact=False only
+# the Bloom filter is kept, so memory is fixed at the cost of false positives
+class URLSeenSet:
+    def __init__(self, capacity=1 << 16, bloom_capacity=None, error_rate=0.01, exact=True):
+        self.fingerprints = FingerprintSet(capacity) if exact else None
+        self.bloom = BloomFilter(bloom_capacity, error_rate) if bloom_capacity else None
+        if self.fingerprints is None and self.bloom is None:
+            raise ValueError("URLSeenSet needs an exact set or a bloom_capacity")
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, url):
+        fingerprint = url_fingerprint(url)
+        if self.bloom is not None and fingerprint not in self.bloom:
+            return False
+        if self.fingerprints is None:
+            return True
+        return fingerprint in self.fingerprints
+
+    # Marks a url as seen. Returns True if it had not been seen before
+    def add(self, url):
+        fingerprint = url_fingerprint(url)
+        if self.fingerprints is not None:
+            added = self.fingerprints.add(fingerprint)
+        else:
+            added = fingerprint not in self.bloom
+        if self.bloom is not None:
+            self.bloom.add(fingerprint)
+        if added:
+            self.count += 1
+        return added
+
+    # Approximate memory used by the fingerprint table and Bloom filter, in bytes
+    def memory_usage(self):
+        usage = 0
+        if self.fingerprints is not None:
+            usage += self.fingerprints.slots.itemsize * len(self.fingerprints.slots)
+        if self.bloom is not None:
+            usage += len(self.bloom.bits)
+        return usage